@@ -1,6 +1,11 @@
 """API endpoints for ATM operations"""
-from fastapi import APIRouter, Path
+from fastapi import APIRouter, Path, Request, Response
+from fastapi.exceptions import RequestValidationError
+from core.responses import DecimalORJSONResponse
+from pydantic import TypeAdapter
+from typing import Annotated
 from datetime import datetime
+import hashlib
 
 from models.schemas import (
     BalanceResponse, TransactionResponse, WithdrawRequest, DepositRequest,
@@ -8,7 +13,16 @@ from models.schemas import (
     TimeDepositResponse, ListTimeDepositsResponse
 )
 from database.test_db import db
-from core.exceptions import AccountNotFoundError, InsufficientFundsError
+from core.exceptions import AccountNotFoundError
+
+# Responses are built from trusted server-side data, so the hot endpoints skip
+# FastAPI's response_model re-validation and dump through cached adapters instead
+_BAL_ADAPTER = TypeAdapter(BalanceResponse)
+_TXN_ADAPTER = TypeAdapter(TransactionResponse)
+_TRANSFER_ADAPTER = TypeAdapter(TransferResponse)
+
+# Shared path parameter type so every route reuses one constrained-string validator
+AccountNumber = Annotated[str, Path(pattern=r"^\d{6}$", description="6-digit account number")]
 
 # Create router (like Django urls.py)
 router = APIRouter(prefix="/accounts", tags=["ATM Operations"])
@@ -18,120 +32,116 @@ time_deposits_router = APIRouter(prefix="/time-deposits", tags=["Time Deposits"]
 
 # Test-only endpoint for resetting database state
 @router.post("/test/reset", include_in_schema=False)
-async def reset_test_database():
+def reset_test_database():
     """Reset test database - only for testing"""
     db.reset_test_data()
     return {"message": "Test database reset successfully"}
 
-@router.get("/{account_number}/balance", response_model=BalanceResponse)
-async def get_balance(account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number")):
+def _balance_etag(balance, last_transaction) -> str:
+    """Quoted ETag for a balance snapshot - changes whenever the account is written"""
+    digest = hashlib.blake2b(f"{balance}:{last_transaction}".encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+@router.get("/{account_number}/balance", response_model=None, responses={200: {"model": BalanceResponse}, 304: {"description": "Balance unchanged"}})
+def get_balance(request: Request, account_number: AccountNumber):
     """Get account balance"""
     try:
         account = db.get_account(account_number)
-        return BalanceResponse(
-            account_number=account.account_number,
-            balance=account.balance,
-            last_transaction=account.last_transaction
-        )
     except ValueError:
         raise AccountNotFoundError(account_number)
+    
+    # Polling clients send back the last ETag; skip serialization when nothing changed
+    etag = _balance_etag(account.balance, account.last_transaction)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=2"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    return DecimalORJSONResponse(_BAL_ADAPTER.dump_python(BalanceResponse.model_construct(
+        account_number=account.account_number,
+        balance=account.balance,
+        last_transaction=account.last_transaction
+    ), mode="json"), headers=headers)
 
-@router.post("/{account_number}/deposit", response_model=TransactionResponse)
-async def deposit_money(request: DepositRequest, account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number")):
+@router.post("/{account_number}/deposit", response_model=None, responses={200: {"model": TransactionResponse}})
+def deposit_money(request: DepositRequest, account_number: AccountNumber):
     """Deposit money to account"""
     try:
-        # Get account
-        account = db.get_account(account_number)
+        # One clock read shared by the stored last_transaction and the response
+        now = datetime.now()
         
-        # Perform deposit
-        previous_balance = account.balance
-        account.balance += request.amount
-        account.last_transaction = datetime.now()
+        # Balance update happens atomically in the store
+        new_balance = db.apply_delta(account_number, request.amount, now)
+        previous_balance = new_balance - request.amount
         
-        # Update account in database
-        db.update_account(account)
-        
-        return TransactionResponse(
+        return _TXN_ADAPTER.dump_python(TransactionResponse.model_construct(
             success=True,
             message="Deposit successful",
-            account_number=account.account_number,
+            account_number=account_number,
             previous_balance=previous_balance,
-            new_balance=account.balance,
+            new_balance=new_balance,
             transaction_amount=request.amount,
-            timestamp=datetime.now()
-        )
+            timestamp=now
+        ), mode="json")
     except ValueError:
         raise AccountNotFoundError(account_number)
 
-@router.post("/{account_number}/withdraw", response_model=TransactionResponse)
-async def withdraw_money(request: WithdrawRequest, account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number")):
+@router.post("/{account_number}/withdraw", response_model=None, responses={200: {"model": TransactionResponse}})
+def withdraw_money(request: WithdrawRequest, account_number: AccountNumber):
     """Withdraw money from account"""
     try:
-        # Get account
-        account = db.get_account(account_number)
+        now = datetime.now()
         
-        # Check sufficient funds
-        if account.balance < request.amount:
-            raise InsufficientFundsError(account_number, account.balance, request.amount)
+        # Funds check and balance update happen atomically in the store
+        new_balance = db.apply_delta(account_number, -request.amount, now)
+        previous_balance = new_balance + request.amount
         
-        # Perform withdrawal
-        previous_balance = account.balance
-        account.balance -= request.amount
-        account.last_transaction = datetime.now()
-        
-        # Update account in database
-        db.update_account(account)
-        
-        return TransactionResponse(
+        return _TXN_ADAPTER.dump_python(TransactionResponse.model_construct(
             success=True,
             message="Withdrawal successful",
-            account_number=account.account_number,
+            account_number=account_number,
             previous_balance=previous_balance,
-            new_balance=account.balance,
+            new_balance=new_balance,
             transaction_amount=request.amount,
-            timestamp=datetime.now()
-        )
+            timestamp=now
+        ), mode="json")
     except ValueError:
         raise AccountNotFoundError(account_number)
 
-@router.post("/{account_number}/transfer", response_model=TransferResponse)
-async def transfer_money(request: TransferRequest, account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number")):
+@router.post("/{account_number}/transfer", response_model=None, responses={200: {"model": TransferResponse}})
+def transfer_money(request: TransferRequest, account_number: AccountNumber):
     """Transfer money between accounts"""
+    # Rejected as invalid input, before the store's not-found mapping below can turn it into a 404
+    if account_number == request.recipient_account:
+        raise RequestValidationError([{
+            "type": "value_error",
+            "loc": ("body", "recipient_account"),
+            "msg": "Cannot transfer money to the same account",
+            "input": request.recipient_account
+        }])
+    
     try:
-        # Get both accounts
-        sender = db.get_account(account_number)
-        recipient = db.get_account(request.recipient_account)
+        # Lookup, funds check and both balance updates happen in a single call
+        now = datetime.now()
+        sender, recipient = db.transfer(account_number, request.recipient_account, request.amount, now)
         
-        # Check sufficient funds
-        if sender.balance < request.amount:
-            raise InsufficientFundsError(account_number, sender.balance, request.amount)
-        
-        # Perform transfer
-        sender.balance -= request.amount
-        recipient.balance += request.amount
-        sender.last_transaction = datetime.now()
-        recipient.last_transaction = datetime.now()
-        
-        # Update both accounts
-        db.update_account(sender)
-        db.update_account(recipient)
-        
-        return TransferResponse(
+        return _TRANSFER_ADAPTER.dump_python(TransferResponse.model_construct(
             success=True,
             message="Transfer successful",
             sender_account=sender.account_number,
             recipient_account=recipient.account_number,
+            sender_previous_balance=sender.balance + request.amount,
             sender_new_balance=sender.balance,
-            recipient_new_balance=recipient.balance,
             transfer_amount=request.amount,
-            timestamp=datetime.now()
-        )
+            transfer_message=request.message,
+            timestamp=now
+        ), mode="json")
     except ValueError:
         raise AccountNotFoundError(account_number)
 
 # Time deposit endpoints (simplified for now)
 @time_deposits_router.post("/", response_model=TimeDepositResponse)
-async def create_time_deposit(request: CreateTimeDepositRequest):
+def create_time_deposit(request: CreateTimeDepositRequest):
     """Create a time deposit"""
     try:
         # For now, return a simple success response
@@ -149,7 +159,7 @@ async def create_time_deposit(request: CreateTimeDepositRequest):
         raise AccountNotFoundError(request.account_number)
 
 @time_deposits_router.get("/{account_number}", response_model=ListTimeDepositsResponse)
-async def list_time_deposits(account_number: str = Path(..., pattern=r"^\d{6}$")):
+def list_time_deposits(account_number: AccountNumber):
     """List time deposits for an account"""
     try:
         # Verify account exists
@@ -2,27 +2,54 @@
 Core application configuration and settings
 """
 import os
-from typing import List
+from dataclasses import dataclass, field
+from typing import Callable, Tuple
 
+def _env(name: str, default: str, cast: Callable = str):
+    """Dataclass field read from the environment when Settings is instantiated"""
+    return field(default_factory=lambda: cast(os.getenv(name, default)))
+
+def _true(value: str) -> bool:
+    return value.lower() == "true"
+
+def _csv(value: str) -> Tuple[str, ...]:
+    return tuple(value.split(","))
+
+@dataclass(frozen=True, slots=True)
 class Settings:
-    """Application settings and configuration"""
+    """Application settings and configuration - read from the environment once at startup"""
     app_name: str = "ATM System API"
-    debug: bool = os.getenv("DEBUG", "False").lower() == "true"
-    environment: str = os.getenv("ENVIRONMENT", "development")
-    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    debug: bool = _env("DEBUG", "False", _true)
+    environment: str = _env("ENVIRONMENT", "development")
+    log_level: str = _env("LOG_LEVEL", "INFO")
     
     # Security settings
-    allowed_hosts: List[str] = os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1,testserver").split(",")
+    allowed_hosts: Tuple[str, ...] = _env("ALLOWED_HOSTS", "localhost,127.0.0.1,testserver", _csv)
     
     # Database settings
-    database_url: str = os.getenv("DATABASE_URL", "sqlite:///./atm_system.db")
+    database_url: str = _env("DATABASE_URL", "sqlite:///./atm_system.db")
+    db_pool_size: int = _env("DB_POOL_SIZE", "20", int)
+    db_max_overflow: int = _env("DB_MAX_OVERFLOW", "10", int)
+    db_pool_timeout: int = _env("DB_POOL_TIMEOUT", "30", int)
+    db_pool_recycle: int = _env("DB_POOL_RECYCLE", "3600", int)
+    use_pgbouncer: bool = _env("USE_PGBOUNCER", "False", lambda v: v.lower() in ("1", "true"))
+    # How often each worker tries to refresh the account_summary materialized view; 0 disables it
+    summary_refresh_seconds: int = _env("SUMMARY_REFRESH_SECONDS", "30", int)
+    
+    # Worker threads for sync endpoints; keep at least db_pool_size + db_max_overflow
+    threadpool_size: int = _env("THREADPOOL_SIZE", "200", int)
     
     # API settings
     api_v1_prefix: str = "/api/v1"
     
-    @property
-    def is_production(self) -> bool:
-        return self.environment.lower() == "production"
+    # Derived once in __post_init__ so they are plain slot reads
+    is_production: bool = field(init=False)
+    # True when DATABASE_URL points at PostgreSQL - the only store shared between processes
+    uses_postgres: bool = field(init=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "is_production", self.environment.lower() == "production")
+        object.__setattr__(self, "uses_postgres", self.database_url.startswith(("postgresql", "postgres://")))
 
 # Global settings instance
 settings = Settings()
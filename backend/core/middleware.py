@@ -0,0 +1,116 @@
+"""
+Lightweight ASGI middleware for the host check, CORS preflight and health probes
+"""
+import re
+from typing import Any, Callable, Iterable, List, Mapping, Optional
+
+import orjson
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+class HostAndPreflightMiddleware:
+    """Reject unknown Host headers and answer CORS preflights and health probes before the rest of the stack runs"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allowed_hosts: Iterable[str],
+        allow_origins: Iterable[str],
+        allow_methods: Iterable[str],
+        allow_credentials: bool = False,
+        max_age: int = 600,
+        health_path: Optional[str] = None,
+        health_payload: Optional[Callable[[], Mapping[str, Any]]] = None,
+    ):
+        self.app = app
+        # Liveness probes are answered here, after the host check, without routing or CORSMiddleware
+        self.health_path = health_path if health_payload is not None else None
+        self.health_payload = health_payload
+        hosts = [host.strip().lower() for host in allowed_hosts]
+        self.allow_any_host = "*" in hosts
+        self.exact_hosts = frozenset(host for host in hosts if "*" not in host)
+        # "*.example.com" patterns compile into one alternation, checked only if the exact lookup misses
+        wildcards = [re.escape(host[2:]) for host in hosts if host.startswith("*.")]
+        self.wildcard_hosts = re.compile(r"^(?:[^.]+\.)+(?:%s)$" % "|".join(wildcards)) if wildcards else None
+
+        self.allow_origins = frozenset(allow_origins)
+        self.allow_methods = frozenset(allow_methods)
+        self.allow_credentials = allow_credentials
+
+        # Static part of every successful preflight response, encoded once
+        self.preflight_headers: List[tuple] = [
+            (b"access-control-allow-methods", ", ".join(sorted(self.allow_methods)).encode("latin-1")),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"vary", b"Origin"),
+            (b"content-length", b"2"),
+            (b"content-type", b"text/plain; charset=utf-8"),
+        ]
+        if allow_credentials:
+            self.preflight_headers.append((b"access-control-allow-credentials", b"true"))
+
+    def _host_allowed(self, host: bytes) -> bool:
+        """Check a raw Host header value against the allowed hosts"""
+        name = host.decode("latin-1").split(":", 1)[0].lower()
+        if name in self.exact_hosts:
+            return True
+        return self.wildcard_hosts is not None and self.wildcard_hosts.match(name) is not None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Read the headers we care about in a single pass
+        host = origin = request_method = request_headers = None
+        for key, value in scope["headers"]:
+            if key == b"host":
+                host = value
+            elif key == b"origin":
+                origin = value
+            elif key == b"access-control-request-method":
+                request_method = value
+            elif key == b"access-control-request-headers":
+                request_headers = value
+
+        if not self.allow_any_host and (host is None or not self._host_allowed(host)):
+            await _respond(send, 400, b"Invalid host header", [(b"content-type", b"text/plain; charset=utf-8")])
+            return
+
+        if scope["method"] == "OPTIONS" and origin is not None and request_method is not None:
+            await self._preflight(send, origin, request_method, request_headers)
+            return
+
+        if scope["path"] == self.health_path and scope["method"] == "GET":
+            await self._health(send, origin)
+            return
+
+        await self.app(scope, receive, send)
+
+    async def _preflight(self, send: Send, origin: bytes, request_method: bytes, request_headers) -> None:
+        """Answer a CORS preflight without dispatching to the app"""
+        if origin.decode("latin-1") not in self.allow_origins or request_method.decode("latin-1") not in self.allow_methods:
+            await _respond(send, 400, b"Disallowed CORS request", [(b"content-type", b"text/plain; charset=utf-8")])
+            return
+
+        headers = [(b"access-control-allow-origin", origin), *self.preflight_headers]
+        if request_headers is not None:
+            # All request headers are allowed, so mirror whatever the browser asked for
+            headers.append((b"access-control-allow-headers", request_headers))
+        await _respond(send, 200, b"OK", headers)
+
+    async def _health(self, send: Send, origin) -> None:
+        """Serve the health payload, with the CORS headers CORSMiddleware would have added"""
+        headers = [(b"content-type", b"application/json")]
+        if origin is not None and origin.decode("latin-1") in self.allow_origins:
+            headers.append((b"access-control-allow-origin", origin))
+            headers.append((b"vary", b"Origin"))
+            if self.allow_credentials:
+                headers.append((b"access-control-allow-credentials", b"true"))
+        await _respond(send, 200, orjson.dumps(self.health_payload()), headers)
+
+async def _respond(send: Send, status: int, body: bytes, headers: list) -> None:
+    """Send a complete plain response"""
+    if not any(key == b"content-length" for key, _ in headers):
+        headers = [*headers, (b"content-length", str(len(body)).encode("latin-1"))]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,20 @@
+"""
+JSON response class used across the API
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+def _default(obj: Any) -> Any:
+    """orjson fallback for the types it doesn't encode natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+class DecimalORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also accepts Decimal amounts, so handlers can pass raw values through"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -2,80 +2,84 @@
 Database interface for the ATM system
 """
 from typing import Optional
+from dataclasses import dataclass
 from decimal import Decimal
 from datetime import datetime
-from sqlalchemy.orm import Session
-from .postgresql import AccountModel, get_db, PostgreSQLAccountDatabase
+from sqlalchemy.ext.asyncio import AsyncSession
+from .postgresql import (
+    AccountModel, get_db, PostgreSQLAccountDatabase, to_cents, from_cents,
+    serializable_txn, retry_on_serialization_failure
+)
 
 class DatabaseInterface:
     """Unified database interface for the ATM system"""
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: AsyncSession):
         self.pg_db = PostgreSQLAccountDatabase(db_session)
     
-    def get_account(self, account_number: str):
+    async def get_account(self, account_number: str):
         """Get account by number - returns a simplified account object"""
-        account_model = self.pg_db.get_account(account_number)
+        account_model = await self.pg_db.get_account(account_number)
         return SimpleAccount(
             account_number=account_model.account_number,
             balance=account_model.balance,
             last_transaction=account_model.last_transaction
         )
     
-    def update_account(self, account):
-        """Update account balance"""
-        # This method will be called by the API to persist changes
-        # For PostgreSQL, we'll handle updates through specific transaction methods
-        pass
-    
-    def deposit(self, account_number: str, amount: Decimal) -> tuple:
-        """Perform deposit and return previous/new balance"""
-        account_model = self.pg_db.get_account(account_number)
-        previous_balance = account_model.balance
-        new_balance = previous_balance + amount
-        
-        self.pg_db.update_account_balance(
+    async def get_balance(self, account_number: str):
+        """Get account balance for read-only use - may be served from the balance cache"""
+        balance, last_transaction = await self.pg_db.get_balance_cached(account_number)
+        return SimpleAccount(
             account_number=account_number,
-            new_balance=new_balance,
-            transaction_type="deposit",
-            amount=amount,
-            description="Deposit"
+            balance=balance,
+            last_transaction=last_transaction
         )
+    
+    @retry_on_serialization_failure(max_tries=3, backoff=0.01)
+    async def transfer(self, sender_account: str, recipient_account: str, amount: Decimal):
+        """Transfer money between accounts - returns (sender, recipient) SimpleAccounts"""
+        async with serializable_txn(self.pg_db.db):
+            balances = await self.pg_db.transfer(sender_account, recipient_account, amount)
+        now = datetime.now()
+        return (
+            SimpleAccount(account_number=sender_account, balance=balances[sender_account], last_transaction=now),
+            SimpleAccount(account_number=recipient_account, balance=balances[recipient_account], last_transaction=now)
+        )
+    
+    @retry_on_serialization_failure(max_tries=3, backoff=0.01)
+    async def deposit(self, account_number: str, amount: Decimal) -> tuple:
+        """Perform deposit and return previous/new balance"""
+        delta = to_cents(amount)
+        async with serializable_txn(self.pg_db.db):
+            new_cents = await self.pg_db.apply_delta(account_number, delta, "deposit", "Deposit")
         
-        return previous_balance, new_balance
+        return from_cents(new_cents - delta), from_cents(new_cents)
     
-    def withdraw(self, account_number: str, amount: Decimal) -> tuple:
+    @retry_on_serialization_failure(max_tries=3, backoff=0.01)
+    async def withdraw(self, account_number: str, amount: Decimal) -> tuple:
         """Perform withdrawal and return previous/new balance"""
-        account_model = self.pg_db.get_account(account_number)
-        previous_balance = account_model.balance
-        
-        if previous_balance < amount:
-            from core.exceptions import InsufficientFundsError
-            raise InsufficientFundsError(account_number, previous_balance, amount)
-        
-        new_balance = previous_balance - amount
-        
-        self.pg_db.update_account_balance(
-            account_number=account_number,
-            new_balance=new_balance,
-            transaction_type="withdrawal",
-            amount=amount,
-            description="Withdrawal"
-        )
+        delta = -to_cents(amount)
+        async with serializable_txn(self.pg_db.db):
+            # Raises InsufficientFundsError when the balance can't cover the amount
+            new_cents = await self.pg_db.apply_delta(account_number, delta, "withdrawal", "Withdrawal")
         
-        return previous_balance, new_balance
+        return from_cents(new_cents - delta), from_cents(new_cents)
 
+@dataclass(slots=True)
 class SimpleAccount:
     """Simple account class to maintain compatibility with existing code"""
+    account_number: str
+    balance: int  # In cents
+    last_transaction: Optional[datetime] = None
     
-    def __init__(self, account_number: str, balance: Decimal, last_transaction: Optional[datetime]):
-        self.account_number = account_number
-        self.balance = balance
-        self.last_transaction = last_transaction
+    @property
+    def balance_decimal(self) -> Decimal:
+        """Balance as a 2-decimal-place Decimal for the API boundary"""
+        return from_cents(self.balance)
 
 # Global database instance placeholder
 db = None
 
-def get_database_interface(db_session: Session) -> DatabaseInterface:
+def get_database_interface(db_session: AsyncSession) -> DatabaseInterface:
     """Get database interface instance"""
     return DatabaseInterface(db_session)
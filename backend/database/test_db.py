@@ -6,39 +6,52 @@ from decimal import Decimal
 from datetime import datetime
 from typing import Optional, Dict
 from dataclasses import dataclass
+from contextlib import ExitStack
+import functools
+import threading
 
-@dataclass
+from core.exceptions import InsufficientFundsError
+
+@dataclass(slots=True)
 class Account:
     """Simple account class for testing"""
     account_number: str
     balance: Decimal
     last_transaction: Optional[datetime] = None
 
+# Seeded balances every test starts from
+_SEED_BALANCES = (
+    ("123456", Decimal("1000.00")),
+    ("789012", Decimal("500.00")),
+    ("555444", Decimal("0.00")),
+)
+
 class TestDatabase:
     """Test database that provides proper test isolation"""
     
-    _instance = None
-    _initialized = False
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(TestDatabase, cls).__new__(cls)
-        return cls._instance
+    # Writes are guarded per account-number bucket so independent accounts don't contend
+    LOCK_BUCKETS = 16
     
     def __init__(self):
-        if not TestDatabase._initialized:
-            self.accounts: Dict[str, Account] = {}
-            self._initialize_test_accounts()
-            TestDatabase._initialized = True
+        self.accounts: Dict[str, Account] = {}
+        self._locks = [threading.Lock() for _ in range(self.LOCK_BUCKETS)]
+        # Account numbers written since the last reset, so a reset only rolls those back
+        self._dirty: set[str] = set()
+        self._initialize_test_accounts()
+    
+    def _bucket(self, account_number: str) -> int:
+        """Get the lock bucket index for an account number"""
+        return hash(account_number) & (self.LOCK_BUCKETS - 1)
+    
+    def _lock_for(self, account_number: str) -> threading.Lock:
+        """Get the lock guarding an account number's bucket"""
+        return self._locks[self._bucket(account_number)]
     
     def _initialize_test_accounts(self):
         """Initialize test accounts"""
         self.accounts.clear()  # Clear existing accounts first
-        self.accounts.update({
-            "123456": Account("123456", Decimal("1000.00")),
-            "789012": Account("789012", Decimal("500.00")),
-            "555444": Account("555444", Decimal("0.00")),
-        })
+        self.accounts.update({number: Account(number, balance) for number, balance in _SEED_BALANCES})
+        self._dirty.clear()
     
     def get_account(self, account_number: str) -> Account:
         """Get account by number"""
@@ -48,28 +61,65 @@ class TestDatabase:
     
     def update_account(self, account: Account):
         """Update account in database"""
-        self.accounts[account.account_number] = account
+        with self._lock_for(account.account_number):
+            self.accounts[account.account_number] = account
+            self._dirty.add(account.account_number)
+    
+    def apply_delta(self, account_number: str, delta: Decimal, timestamp: Optional[datetime] = None) -> Decimal:
+        """Add delta to a balance under the account's lock, returning the new balance"""
+        with self._lock_for(account_number):
+            account = self.get_account(account_number)
+            if account.balance + delta < 0:
+                raise InsufficientFundsError(account_number, account.balance, -delta)
+            
+            account.balance += delta
+            account.last_transaction = timestamp or datetime.now()
+            self._dirty.add(account_number)
+            return account.balance
+    
+    def transfer(self, sender_account: str, recipient_account: str, amount: Decimal, timestamp: Optional[datetime] = None):
+        """Move money between two accounts in one step, returning (sender, recipient)"""
+        if sender_account == recipient_account:
+            raise ValueError("Cannot transfer money to the same account")
+        
+        # Take bucket locks in index order so crossing transfers can't deadlock
+        buckets = sorted({self._bucket(sender_account), self._bucket(recipient_account)})
+        with ExitStack() as stack:
+            for bucket in buckets:
+                stack.enter_context(self._locks[bucket])
+            
+            sender = self.get_account(sender_account)
+            recipient = self.get_account(recipient_account)
+            if sender.balance < amount:
+                raise InsufficientFundsError(sender_account, sender.balance, amount)
+            
+            now = timestamp or datetime.now()
+            sender.balance -= amount
+            recipient.balance += amount
+            sender.last_transaction = now
+            recipient.last_transaction = now
+            self._dirty.update((sender_account, recipient_account))
+            return sender, recipient
     
     def reset_test_data(self):
         """Reset all accounts to initial test state"""
+        # Roll back only the accounts written since the last reset - a read-only test costs nothing
+        if not self._dirty and len(self.accounts) >= len(_SEED_BALANCES):
+            return
+        self._dirty.clear()
         # Instead of recreating the dictionary, update existing account objects
-        if "123456" in self.accounts:
-            self.accounts["123456"].balance = Decimal("1000.00")
-            self.accounts["123456"].last_transaction = None
-        else:
-            self.accounts["123456"] = Account("123456", Decimal("1000.00"))
-        
-        if "789012" in self.accounts:
-            self.accounts["789012"].balance = Decimal("500.00")
-            self.accounts["789012"].last_transaction = None
-        else:
-            self.accounts["789012"] = Account("789012", Decimal("500.00"))
-        
-        if "555444" in self.accounts:
-            self.accounts["555444"].balance = Decimal("0.00")
-            self.accounts["555444"].last_transaction = None
-        else:
-            self.accounts["555444"] = Account("555444", Decimal("0.00"))
+        for account_number, balance in _SEED_BALANCES:
+            with self._lock_for(account_number):
+                if account_number in self.accounts:
+                    self.accounts[account_number].balance = balance
+                    self.accounts[account_number].last_transaction = None
+                else:
+                    self.accounts[account_number] = Account(account_number, balance)
+
+@functools.lru_cache(maxsize=1)
+def get_test_db() -> TestDatabase:
+    """Get the process-wide test database, created on first use"""
+    return TestDatabase()
 
 # Global test database instance (singleton)
-db = TestDatabase()
+db = get_test_db()
@@ -3,13 +3,15 @@ Main FastAPI application with restructured imports
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.exceptions import RequestValidationError
 import sys
 import os
 from pathlib import Path
 from datetime import datetime
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import logging
+import anyio.to_thread
 
 # Add backend directory to Python path
 backend_dir = Path(__file__).parent
@@ -17,6 +19,8 @@ sys.path.insert(0, str(backend_dir))
 
 # Import from restructured modules
 from core.config import settings
+from core.middleware import HostAndPreflightMiddleware
+from core.responses import DecimalORJSONResponse
 from core.exceptions import (
     AccountNotFoundError, InsufficientFundsError, InvalidAmountError,
     account_not_found_handler, insufficient_funds_handler, 
@@ -33,6 +37,44 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+def _health_payload() -> dict:
+    """Body of GET /health"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(),
+        "environment": settings.environment,
+        "debug": settings.debug,
+        "version": "1.0.0"
+    }
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    # Account endpoints are sync and run on the threadpool, so size it for the DB pool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    listener = None
+    refresher = None
+    # The engine, LISTEN connection and view refresher only exist when PostgreSQL is the configured store
+    if settings.uses_postgres:
+        # Build this worker's DB engine up front instead of on the first request
+        from database.postgresql import get_engine, start_cache_listener, run_summary_refresher
+        get_engine()
+        # Cross-worker balance cache invalidation; without it the cache just expires on its TTL
+        try:
+            listener = await start_cache_listener()
+        except Exception as e:
+            logger.warning(f"Balance cache invalidation listener not started: {e}")
+        # account_summary is a materialized view - without this it stays at its creation-time snapshot
+        if settings.summary_refresh_seconds > 0:
+            refresher = asyncio.create_task(run_summary_refresher(settings.summary_refresh_seconds))
+    yield
+    if refresher is not None:
+        refresher.cancel()
+        with suppress(asyncio.CancelledError):
+            await refresher
+    if listener is not None:
+        await listener.close()
+
 def create_app() -> FastAPI:
     """Factory function to create FastAPI application"""
     
@@ -43,23 +85,35 @@ def create_app() -> FastAPI:
         version="1.0.0",
         debug=settings.debug,
         docs_url="/docs" if not settings.is_production else None,
-        redoc_url="/redoc" if not settings.is_production else None
+        redoc_url="/redoc" if not settings.is_production else None,
+        default_response_class=DecimalORJSONResponse,
+        lifespan=lifespan
     )
 
-    # Security middleware
-    app.add_middleware(
-        TrustedHostMiddleware, 
-        allowed_hosts=settings.allowed_hosts
-    )
+    cors_origins = ["http://localhost:3000", "http://localhost:5173", "http://localhost:5174", "http://localhost:5175"] if not settings.is_production else []
+    cors_methods = ["GET", "POST", "OPTIONS"]
 
+    # CORS headers on actual (non-preflight) responses
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["http://localhost:3000", "http://localhost:5173", "http://localhost:5174", "http://localhost:5175"] if not settings.is_production else [],
+        allow_origins=cors_origins,
         allow_credentials=True,
-        allow_methods=["GET", "POST", "OPTIONS"],
+        allow_methods=cors_methods,
         allow_headers=["*"],
     )
 
+    # Security middleware - added last so it runs first: host check, preflight and
+    # health probe answers happen before any other middleware or routing
+    app.add_middleware(
+        HostAndPreflightMiddleware,
+        allowed_hosts=settings.allowed_hosts,
+        allow_origins=cors_origins,
+        allow_methods=cors_methods,
+        allow_credentials=True,
+        health_path="/health",
+        health_payload=_health_payload
+    )
+
     # Register exception handlers - order matters!
     app.add_exception_handler(AccountNotFoundError, account_not_found_handler)
     app.add_exception_handler(InsufficientFundsError, insufficient_funds_handler)
@@ -78,16 +132,11 @@ def create_app() -> FastAPI:
         """Root endpoint"""
         return {"message": "ATM System is running!"}
 
+    # Answered by HostAndPreflightMiddleware; the route keeps it in the OpenAPI schema
     @app.get("/health")
     async def health_check():
         """Health check endpoint"""
-        return {
-            "status": "healthy",
-            "timestamp": datetime.now(),
-            "environment": settings.environment,
-            "debug": settings.debug,
-            "version": "1.0.0"
-        }
+        return _health_payload()
 
     return app
 
@@ -98,11 +147,20 @@ if __name__ == "__main__":
     import uvicorn
     
     port = int(os.environ.get("PORT", 8000))
-    logger.info(f"Starting server on port {port}")
+    # Multiple workers can't reload, so auto-reload only applies to a single dev worker
+    reload = settings.debug and os.getenv("WEB_CONCURRENCY") is None
+    # Each worker process has its own in-memory store, so more than one worker splits
+    # balances across processes; default to several only when PostgreSQL is the store
+    default_workers = "4" if settings.uses_postgres else "1"
+    workers = 1 if reload else int(os.getenv("WEB_CONCURRENCY", default_workers))
+    logger.info(f"Starting server on port {port} with {workers} worker(s)")
     
     uvicorn.run(
         "main:app", 
         host="0.0.0.0", 
         port=port,
-        reload=settings.debug
+        loop="uvloop" if sys.platform != "win32" else "asyncio",  # uvloop has no Windows build
+        http="httptools",
+        workers=workers,
+        reload=reload
     )
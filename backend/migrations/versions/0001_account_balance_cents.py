@@ -0,0 +1,36 @@
+"""Store account balances as integer cents
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-14
+
+Databases created by create_tables() after this change already have the BIGINT
+column - run `alembic stamp 0001` on those instead of upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.alter_column(
+        "accounts",
+        "balance",
+        type_=sa.BigInteger(),
+        existing_type=sa.DECIMAL(15, 2),
+        existing_nullable=False,
+        postgresql_using="ROUND(balance * 100)::bigint",
+    )
+
+def downgrade():
+    op.alter_column(
+        "accounts",
+        "balance",
+        type_=sa.DECIMAL(15, 2),
+        existing_type=sa.BigInteger(),
+        existing_nullable=False,
+        postgresql_using="balance / 100.0",
+    )
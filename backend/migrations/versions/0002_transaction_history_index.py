@@ -0,0 +1,30 @@
+"""Add account/timestamp index on transactions and drop duplicate PK indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-14
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# index=True on the primary keys created a second B-tree next to each PK index
+_DUPLICATE_PK_INDEXES = [
+    ("ix_accounts_account_number", "accounts", "account_number"),
+    ("ix_transactions_id", "transactions", "id"),
+    ("ix_time_deposits_deposit_id", "time_deposits", "deposit_id"),
+]
+
+def upgrade():
+    op.create_index("ix_txn_acct_ts", "transactions", ["account_number", sa.text("timestamp DESC")])
+    for name, _, _ in _DUPLICATE_PK_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+def downgrade():
+    for name, table, column in _DUPLICATE_PK_INDEXES:
+        op.create_index(name, table, [column])
+    op.drop_index("ix_txn_acct_ts", table_name="transactions")
@@ -0,0 +1,26 @@
+"""Add account_summary materialized view
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-14
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("""
+        CREATE MATERIALIZED VIEW account_summary AS
+        SELECT a.account_number, a.balance, a.last_transaction,
+               COUNT(td.deposit_id) FILTER (WHERE NOT td.is_matured) AS open_deposits
+        FROM accounts a LEFT JOIN time_deposits td USING (account_number)
+        GROUP BY a.account_number, a.balance, a.last_transaction
+    """)
+    # Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX ux_account_summary_account ON account_summary (account_number)")
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS account_summary")
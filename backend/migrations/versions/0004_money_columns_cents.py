@@ -0,0 +1,63 @@
+"""Store transaction and time deposit amounts as integer cents
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-14
+
+interest_rate becomes integer basis points. account_summary only reads
+accounts.balance, which is already cents, so the view is left alone.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# (table, column, nullable)
+_CENT_COLUMNS = [
+    ("transactions", "amount", False),
+    ("transactions", "balance_before", False),
+    ("transactions", "balance_after", False),
+    ("time_deposits", "amount", False),
+    ("time_deposits", "final_amount", True),
+]
+
+def upgrade():
+    for table, column, nullable in _CENT_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.BigInteger(),
+            existing_type=sa.DECIMAL(15, 2),
+            existing_nullable=nullable,
+            postgresql_using=f"ROUND({column} * 100)::bigint",
+        )
+    op.alter_column(
+        "time_deposits",
+        "interest_rate",
+        type_=sa.Integer(),
+        existing_type=sa.DECIMAL(5, 4),
+        existing_nullable=False,
+        postgresql_using="ROUND(interest_rate * 10000)::integer",
+    )
+
+def downgrade():
+    op.alter_column(
+        "time_deposits",
+        "interest_rate",
+        type_=sa.DECIMAL(5, 4),
+        existing_type=sa.Integer(),
+        existing_nullable=False,
+        postgresql_using="interest_rate / 10000.0",
+    )
+    for table, column, nullable in _CENT_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.DECIMAL(15, 2),
+            existing_type=sa.BigInteger(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column} / 100.0",
+        )
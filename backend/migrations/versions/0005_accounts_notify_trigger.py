@@ -0,0 +1,31 @@
+"""Notify accounts_changed on every account update
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-14
+
+Each worker LISTENs on the channel and drops its cached balance for the
+account in the payload.
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_account_changed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('accounts_changed', NEW.account_number);
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("CREATE TRIGGER accounts_notify AFTER UPDATE ON accounts FOR EACH ROW EXECUTE FUNCTION notify_account_changed()")
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS accounts_notify ON accounts")
+    op.execute("DROP FUNCTION IF EXISTS notify_account_changed()")
@@ -1,38 +1,84 @@
-from pydantic import BaseModel, Field, field_validator, model_serializer
-from typing import Optional, Dict, Any
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, PlainSerializer, field_validator, model_serializer
+from typing import Annotated, Optional, Dict, Any
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+import re
+
+# Money is held to cents; hoisted so validators don't rebuild it per call
+_CENT = Decimal('0.01')
+
+def _to_decimal(v) -> Decimal:
+    """Coerce a validated value to Decimal, parsing a string only when there's no cheaper route"""
+    if type(v) is Decimal:
+        return v
+    if type(v) is int:
+        return Decimal(v)
+    if type(v) is float:
+        return Decimal(repr(v))
+    return Decimal(str(v))
+
+def _quantize_cents(d: Decimal) -> Decimal:
+    """Quantize to 2 places, skipping the work when already there"""
+    return d if d.as_tuple().exponent == -2 else d.quantize(_CENT)
+
+def _check_amount_precision(v: Decimal) -> Decimal:
+    """Ensure amount has max 2 decimal places"""
+    decimal_v = _to_decimal(v)
+    exponent = decimal_v.as_tuple().exponent
+    if exponent < -2:
+        raise ValueError('Amount must have maximum 2 decimal places')
+    if exponent == -2:
+        return decimal_v
+    try:
+        return decimal_v.quantize(_CENT)
+    except InvalidOperation:
+        # Runs before each field's upper bound, so absurdly long inputs land here first
+        raise ValueError('Amount is too large')
+
+# Decimal amounts go out as JSON numbers; declared per field so pydantic-core does the
+# serialization instead of a Python model_serializer per response
+_AS_FLOAT = PlainSerializer(float, return_type=float)
+Money = Annotated[Decimal, _AS_FLOAT]
+
+# Positive, cent-precision input amount - one shared validator schema for every amount
+# field; each field adds its own upper bound
+Amount = Annotated[Decimal, Field(gt=0), AfterValidator(_check_amount_precision)]
+
+# One compiled pattern shared by every account-number field (fullmatch, so no trailing-newline slip)
+ACCOUNT_RE = re.compile(r"[0-9]{6}")
+
+def is_valid_account(account_number: str) -> bool:
+    """Cheap account-number check for callers that don't need a full model"""
+    return isinstance(account_number, str) and ACCOUNT_RE.fullmatch(account_number) is not None
+
+def _check_account_number(v: str) -> str:
+    """Shared body of the account-number field validators"""
+    if not is_valid_account(v):
+        raise ValueError('Account number must be exactly 6 digits')
+    return v
 
 class Account(BaseModel):
     """Account data model with enhanced validation"""
-    account_number: str = Field(..., pattern=r"^\d{6}$", description="6-digit account number")
+    account_number: str = Field(..., description="6-digit account number")
     balance: Decimal = Field(ge=0, le=1000000, description="Account balance (0-1M)")
     created_at: datetime
     last_transaction: Optional[datetime] = None
     
+    @field_validator('account_number')
+    @classmethod
+    def validate_account_number(cls, v):
+        """Ensure account numbers are exactly 6 digits"""
+        return _check_account_number(v)
+    
     @field_validator('balance')
     @classmethod
     def convert_balance_to_decimal(cls, v):
         """Convert balance to Decimal with 2 decimal places"""
-        if isinstance(v, (int, float)):
-            return Decimal(str(v)).quantize(Decimal('0.01'))
-        elif isinstance(v, Decimal):
-            return v.quantize(Decimal('0.01'))
-        return Decimal(str(v)).quantize(Decimal('0.01'))
+        return _quantize_cents(_to_decimal(v))
 
 class TransactionRequest(BaseModel):
     """Base model for transaction requests with strict validation"""
-    amount: Decimal = Field(gt=0, le=10000, description="Transaction amount (0-10K per transaction)")
-    
-    @field_validator('amount')
-    @classmethod
-    def validate_amount_precision(cls, v):
-        """Ensure amount has max 2 decimal places"""
-        # Convert to Decimal and check precision
-        decimal_v = Decimal(str(v))
-        if decimal_v.as_tuple().exponent < -2:
-            raise ValueError('Amount must have maximum 2 decimal places')
-        return decimal_v.quantize(Decimal('0.01'))
+    amount: Annotated[Amount, Field(le=10000, description="Transaction amount (0-10K per transaction)")]
 
 class WithdrawRequest(TransactionRequest):
     """Request model for withdrawal operations"""
@@ -42,120 +88,95 @@ class DepositRequest(TransactionRequest):
     """Request model for deposit operations"""
     pass
 
-# Response models remain the same but add validation
+# Response models remain the same but add validation; the per-request ones are frozen (write-once, hashable)
 class BalanceResponse(BaseModel):
     """Response model for balance queries"""
-    account_number: str = Field(..., pattern=r"^\d{6}$")
-    balance: Decimal = Field(ge=0)
+    model_config = ConfigDict(frozen=True)
+    
+    account_number: str = Field(...)
+    balance: Money = Field(ge=0)
     last_transaction: Optional[datetime] = None
     
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        return {
-            "account_number": self.account_number,
-            "balance": float(self.balance),
-            "last_transaction": self.last_transaction
-        }
+    @field_validator('account_number')
+    @classmethod
+    def validate_account_number(cls, v):
+        """Ensure account numbers are exactly 6 digits"""
+        return _check_account_number(v)
 
 class TransactionResponse(BaseModel):
     """Response model for transaction operations"""
+    model_config = ConfigDict(frozen=True)
+    
     success: bool
     message: str = Field(..., max_length=200)
-    account_number: str = Field(..., pattern=r"^\d{6}$")
-    previous_balance: Decimal = Field(ge=0)
-    new_balance: Decimal = Field(ge=0)
-    transaction_amount: Decimal = Field(gt=0)
+    account_number: str = Field(...)
+    previous_balance: Money = Field(ge=0)
+    new_balance: Money = Field(ge=0)
+    transaction_amount: Money = Field(gt=0)
     timestamp: datetime
     
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        return {
-            "success": self.success,
-            "message": self.message,
-            "account_number": self.account_number,
-            "previous_balance": float(self.previous_balance),
-            "new_balance": float(self.new_balance),
-            "transaction_amount": float(self.transaction_amount),
-            "timestamp": self.timestamp
-        }
+    @field_validator('account_number')
+    @classmethod
+    def validate_account_number(cls, v):
+        """Ensure account numbers are exactly 6 digits"""
+        return _check_account_number(v)
 
 # Money Transfer Models
 class TransferRequest(BaseModel):
     """Request model for money transfer operations"""
-    amount: Decimal = Field(gt=0, le=10000, description="Transfer amount (0-10K per transfer)")
-    recipient_account: str = Field(..., pattern=r"^\d{6}$", description="6-digit recipient account number")
+    amount: Annotated[Amount, Field(le=10000, description="Transfer amount (0-10K per transfer)")]
+    recipient_account: str = Field(..., description="6-digit recipient account number")
     message: Optional[str] = Field(None, max_length=100, description="Optional transfer message")
     
-    @field_validator('amount')
+    @field_validator('recipient_account')
     @classmethod
-    def validate_amount_precision(cls, v):
-        """Ensure amount has max 2 decimal places"""
-        decimal_v = Decimal(str(v))
-        if decimal_v.as_tuple().exponent < -2:
-            raise ValueError('Amount must have maximum 2 decimal places')
-        return decimal_v.quantize(Decimal('0.01'))
+    def validate_account_number(cls, v):
+        """Ensure account numbers are exactly 6 digits"""
+        return _check_account_number(v)
 
 class TransferResponse(BaseModel):
     """Response model for money transfer operations"""
+    model_config = ConfigDict(frozen=True)
+    
     success: bool
     message: str = Field(..., max_length=200)
-    sender_account: str = Field(..., pattern=r"^\d{6}$")
-    recipient_account: str = Field(..., pattern=r"^\d{6}$")
-    sender_previous_balance: Decimal = Field(ge=0)
-    sender_new_balance: Decimal = Field(ge=0)
-    transfer_amount: Decimal = Field(gt=0)
+    sender_account: str = Field(...)
+    recipient_account: str = Field(...)
+    sender_previous_balance: Money = Field(ge=0)
+    sender_new_balance: Money = Field(ge=0)
+    transfer_amount: Money = Field(gt=0)
     transfer_message: Optional[str] = None
     timestamp: datetime
     
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        return {
-            "success": self.success,
-            "message": self.message,
-            "sender_account": self.sender_account,
-            "recipient_account": self.recipient_account,
-            "sender_previous_balance": float(self.sender_previous_balance),
-            "sender_new_balance": float(self.sender_new_balance),
-            "transfer_amount": float(self.transfer_amount),
-            "transfer_message": self.transfer_message,
-            "timestamp": self.timestamp
-        }
+    @field_validator('sender_account', 'recipient_account')
+    @classmethod
+    def validate_account_number(cls, v):
+        """Ensure account numbers are exactly 6 digits"""
+        return _check_account_number(v)
 
 # Time Deposit Models
 class TimeDeposit(BaseModel):
     """Time deposit data model"""
     deposit_id: str = Field(..., description="Unique deposit identifier")
-    account_number: str = Field(..., pattern=r"^\d{6}$", description="6-digit account number")
-    amount: Decimal = Field(gt=0, description="Deposit amount")
+    account_number: str = Field(..., description="6-digit account number")
+    amount: Annotated[Amount, _AS_FLOAT, Field(description="Deposit amount")]
     duration_months: int = Field(ge=1, le=60, description="Deposit duration in months (1-60)")
-    interest_rate: Decimal = Field(ge=0, description="Annual interest rate as decimal")
+    interest_rate: Money = Field(ge=0, description="Annual interest rate as decimal")
     created_at: datetime
     maturity_date: datetime
     is_matured: bool = False
     
-    @field_validator('amount')
+    @field_validator('account_number')
     @classmethod
-    def validate_amount_precision(cls, v):
-        """Ensure amount has max 2 decimal places"""
-        decimal_v = Decimal(str(v))
-        if decimal_v.as_tuple().exponent < -2:
-            raise ValueError('Amount must have maximum 2 decimal places')
-        return decimal_v.quantize(Decimal('0.01'))
+    def validate_account_number(cls, v):
+        """Ensure account numbers are exactly 6 digits"""
+        return _check_account_number(v)
 
 class CreateTimeDepositRequest(BaseModel):
     """Request model for creating time deposits"""
-    amount: Decimal = Field(gt=0, le=100000, description="Deposit amount (0-100K per deposit)")
+    amount: Annotated[Amount, Field(le=100000, description="Deposit amount (0-100K per deposit)")]
     duration_months: int = Field(ge=1, le=60, description="Deposit duration in months (1-60)")
     is_test_deposit: bool = Field(default=False, description="Whether this is a test deposit that matures in 1 second")
-    
-    @field_validator('amount')
-    @classmethod
-    def validate_amount_precision(cls, v):
-        """Ensure amount has max 2 decimal places"""
-        decimal_v = Decimal(str(v))
-        if decimal_v.as_tuple().exponent < -2:
-            raise ValueError('Amount must have maximum 2 decimal places')
-        return decimal_v.quantize(Decimal('0.01'))
 
 class TimeDepositResponse(BaseModel):
     """Response model for time deposit operations"""
@@ -163,23 +184,12 @@ class TimeDepositResponse(BaseModel):
     message: str = Field(..., max_length=200)
     deposit: Optional[TimeDeposit] = None
     
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        result = {
-            "success": self.success,
-            "message": self.message
-        }
-        if self.deposit:
-            result["deposit"] = {
-                "deposit_id": self.deposit.deposit_id,
-                "account_number": self.deposit.account_number,
-                "amount": float(self.deposit.amount),
-                "duration_months": self.deposit.duration_months,
-                "interest_rate": float(self.deposit.interest_rate),
-                "created_at": self.deposit.created_at,
-                "maturity_date": self.deposit.maturity_date,
-                "is_matured": self.deposit.is_matured
-            }
+    @model_serializer(mode="wrap")
+    def serialize_model(self, handler) -> Dict[str, Any]:
+        # Field serialization runs in pydantic-core; only drop the absent deposit here
+        result = handler(self)
+        if result.get("deposit") is None:
+            result.pop("deposit", None)
         return result
 
 class ListTimeDepositsResponse(BaseModel):
@@ -187,23 +197,3 @@ class ListTimeDepositsResponse(BaseModel):
     success: bool
     message: str = Field(..., max_length=200)
     deposits: list[TimeDeposit] = []
-    
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        return {
-            "success": self.success,
-            "message": self.message,
-            "deposits": [
-                {
-                    "deposit_id": deposit.deposit_id,
-                    "account_number": deposit.account_number,
-                    "amount": float(deposit.amount),
-                    "duration_months": deposit.duration_months,
-                    "interest_rate": float(deposit.interest_rate),
-                    "created_at": deposit.created_at,
-                    "maturity_date": deposit.maturity_date,
-                    "is_matured": deposit.is_matured
-                }
-                for deposit in self.deposits
-            ]
-        }
\ No newline at end of file
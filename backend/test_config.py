@@ -1,6 +1,8 @@
 """
 Test configuration for FastAPI app
 """
+import functools
+
 from fastapi import FastAPI
 from backend.main import create_app
 from backend.database.test_db import db as test_db
@@ -15,5 +17,13 @@ def create_test_app() -> FastAPI:
     
     return app
 
-# Create test app instance
-test_app = create_test_app()
+@functools.lru_cache(maxsize=1)
+def get_test_app() -> FastAPI:
+    """Get the shared test app, building it on first use"""
+    return create_test_app()
+
+def __getattr__(name):
+    """Build `test_app` lazily so importing this module registers no routes"""
+    if name == "test_app":
+        return get_test_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
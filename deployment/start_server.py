@@ -4,22 +4,14 @@ Railway startup script for ATM System
 Handles port detection and Python path setup
 """
 import os
-import subprocess
 import sys
 from pathlib import Path
 
+# Directory uvicorn imports the app from, put first on the server's PYTHONPATH
+ROOT = Path(__file__).resolve().parent
+
 def main():
-    # Add current directory to Python path
-    current_dir = Path(__file__).parent
-    if str(current_dir) not in sys.path:
-        sys.path.insert(0, str(current_dir))
-    
-    # Set PYTHONPATH environment variable for subprocess
-    python_path = os.environ.get('PYTHONPATH', '')
-    if python_path:
-        python_path = f"{current_dir}:{python_path}"
-    else:
-        python_path = str(current_dir)
+    python_path = os.pathsep.join(filter(None, [str(ROOT), os.environ.get('PYTHONPATH', '')]))
     
     # Get port from environment variable, default to 8000
     port = os.environ.get('PORT', '8000')
@@ -31,21 +23,37 @@ def main():
         print(f"Invalid PORT value: {port}, using default 8000")
         port_num = 8000
     
+    # Worker processes, same WEB_CONCURRENCY knob as backend/main.py. The app keeps accounts
+    # in an in-process store, so it stays at one worker unless more are asked for explicitly
+    workers = os.environ.get('WEB_CONCURRENCY', '1')
+    try:
+        workers_num = max(1, int(workers))
+    except ValueError:
+        print(f"Invalid WEB_CONCURRENCY value: {workers}, using default 1")
+        workers_num = 1
+    
     # Start the server with uvicorn
     cmd = [
         sys.executable, '-m', 'uvicorn', 
         'main:app', 
         '--host', '0.0.0.0', 
-        '--port', str(port_num)
+        '--port', str(port_num),
+        '--workers', str(workers_num),
+        '--http', 'httptools'
     ]
+    if sys.platform != 'win32':
+        # uvloop has no Windows build
+        cmd += ['--loop', 'uvloop']
     
-    # Set environment for subprocess
+    # Set environment for uvicorn
     env = os.environ.copy()
     env['PYTHONPATH'] = python_path
     
-    print(f"Starting ATM System server on port {port_num}...")
+    print(f"Starting ATM System server on port {port_num} with {workers_num} worker(s)...")
     print(f"PYTHONPATH: {python_path}")
-    subprocess.run(cmd, env=env)
+    # Replace this process with uvicorn so it receives the platform's SIGTERM directly
+    sys.stdout.flush()
+    os.execvpe(cmd[0], cmd, env)
 
 if __name__ == '__main__':
     main()
@@ -1,17 +1,32 @@
 import os
+from dataclasses import dataclass, field
+from typing import Callable, Tuple
 
+def _env(name: str, default: str, cast: Callable = str):
+    """Dataclass field read from the environment when Settings is instantiated"""
+    return field(default_factory=lambda: cast(os.getenv(name, default)))
+
+def _true(value: str) -> bool:
+    return value.lower() == "true"
+
+def _csv(value: str) -> Tuple[str, ...]:
+    return tuple(value.split(","))
+
+@dataclass(frozen=True, slots=True)
 class Settings:
     """Application settings and configuration"""
     app_name: str = "ATM System API"
-    debug: bool = os.getenv("DEBUG", "False").lower() == "true"
-    environment: str = os.getenv("ENVIRONMENT", "development")
-    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    debug: bool = _env("DEBUG", "False", _true)
+    environment: str = _env("ENVIRONMENT", "development")
+    log_level: str = _env("LOG_LEVEL", "INFO")
     
     # Security settings
-    allowed_hosts: list = os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1,testserver").split(",")
+    allowed_hosts: Tuple[str, ...] = _env("ALLOWED_HOSTS", "localhost,127.0.0.1,testserver", _csv)
+    
+    # Derived once in __post_init__ so it is a plain slot read
+    is_production: bool = field(init=False)
     
-    @property
-    def is_production(self) -> bool:
-        return self.environment.lower() == "production"
+    def __post_init__(self):
+        object.__setattr__(self, "is_production", self.environment.lower() == "production")
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
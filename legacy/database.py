@@ -1,65 +1,102 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, ValuesView
 from datetime import datetime, timedelta
 from decimal import Decimal
+from types import MappingProxyType
 from models import Account, TimeDeposit
-import uuid
+from exceptions import AccountNotFoundError, InsufficientFundsError
+import bisect
+import os
+
+# Interest rates by duration (annual rates as decimals), shared by every AccountDatabase
+INTEREST_RATES = MappingProxyType({
+    1: Decimal('0.01'),   # 1%
+    3: Decimal('0.015'),  # 1.5%
+    6: Decimal('0.02'),   # 2%
+    12: Decimal('0.025'), # 2.5%
+    24: Decimal('0.03'),  # 3%
+    36: Decimal('0.035'), # 3.5%
+    48: Decimal('0.04'),  # 4%
+    60: Decimal('0.045'), # 4.5%
+})
+# Sorted tier lookup table so get_interest_rate can bisect instead of sorting per call
+_RATE_KEYS = tuple(sorted(INTEREST_RATES))
+_RATE_VALUES = tuple(INTEREST_RATES[k] for k in _RATE_KEYS)
+# Same rates as integer basis points, for cents-based interest math
+_RATE_BPS = {rate: int(rate * 10000) for rate in INTEREST_RATES.values()}
+
+# Maturity offsets for every allowed duration (1-60 months, ~30 days each)
+_MATURITY_DELTAS = {m: timedelta(days=m * 30) for m in range(1, 61)}
+_TEST_DELTA = timedelta(seconds=1)
+
+def _rate_bps(rate: Decimal) -> int:
+    """Annual rate as integer basis points"""
+    return _RATE_BPS.get(rate) or int(rate * 10000)
+
+def _batch_mature(amounts_cents: List[int], rates_bps: List[int], months: List[int]) -> List[int]:
+    """Final amounts in cents (principal plus simple interest, rounded down) for parallel deposit columns"""
+    return [a + a * r * m // (12 * 10000) for a, r, m in zip(amounts_cents, rates_bps, months)]
+
+# Sample account templates, built once at import with a single shared timestamp.
+# Literal, already-valid values, so skip model validation
+_SAMPLE_CREATED_AT = datetime.now()
+_SAMPLE_ACCOUNTS = MappingProxyType({
+    number: Account.model_construct(account_number=number, balance=balance, created_at=_SAMPLE_CREATED_AT, last_transaction=None)
+    for number, balance in (
+        ("123456", Decimal('1000.00')),
+        ("789012", Decimal('500.00')),
+        ("555444", Decimal('0.00')),  # Empty account for testing
+    )
+})
+
+def _make_sample_accounts() -> Dict[str, Account]:
+    """Copy the sample accounts - skipped when ATM_SKIP_SAMPLE_ACCOUNTS is set"""
+    if os.getenv("ATM_SKIP_SAMPLE_ACCOUNTS", "").lower() in ("1", "true"):
+        return {}
+    # Shallow copies are enough: every field value is immutable
+    return {number: account.model_copy() for number, account in _SAMPLE_ACCOUNTS.items()}
 
 class AccountDatabase:
     """In-memory database for accounts implemented with a dictionary"""
     
     def __init__(self):
         # Initialize with sample accounts
-        self.accounts: Dict[str, Account] = {
-            "123456": Account(
-                account_number="123456",
-                balance=Decimal('1000.00'),
-                created_at=datetime.now(),
-                last_transaction=None
-            ),
-            "789012": Account(
-                account_number="789012", 
-                balance=Decimal('500.00'),
-                created_at=datetime.now(),
-                last_transaction=None
-            ),
-            "555444": Account(
-                account_number="555444",
-                balance=Decimal('0.00'),  # Empty account for testing
-                created_at=datetime.now(),
-                last_transaction=None
-            )
-        }
+        self.accounts: Dict[str, Account] = _make_sample_accounts()
         
         # Initialize time deposits storage
         self.time_deposits: Dict[str, TimeDeposit] = {}
+        # Secondary index: account number -> its deposit IDs, in creation order
+        self._deposits_by_account: Dict[str, List[str]] = {}
         
-        # Interest rates by duration (annual rates as decimals)
-        self.interest_rates = {
-            1: Decimal('0.01'),   # 1%
-            3: Decimal('0.015'),  # 1.5%
-            6: Decimal('0.02'),   # 2%
-            12: Decimal('0.025'), # 2.5%
-            24: Decimal('0.03'),  # 3%
-            36: Decimal('0.035'), # 3.5%
-            48: Decimal('0.04'),  # 4%
-            60: Decimal('0.045'), # 4.5%
-        }
+        # Interest rates by duration (annual rates as decimals) - shared, read-only
+        self.interest_rates = INTEREST_RATES
     
     def get_account(self, account_number: str) -> Account:
         """Get account by number"""
-        if account_number not in self.accounts:
-            raise ValueError(f"Account {account_number} not found")
-        account = self.accounts[account_number]
-        # Ensure balance is always Decimal
-        if not isinstance(account.balance, Decimal):
-            account.balance = Decimal(str(account.balance)).quantize(Decimal('0.01'))
+        account = self.accounts.get(account_number)
+        if account is None:
+            raise AccountNotFoundError(account_number)
         return account
     
-    def update_account(self, account: Account) -> None:
+    def _get_two(self, first: str, second: str) -> tuple[Account, Account]:
+        """Get two accounts with one lookup each, raising for whichever is missing"""
+        accounts = self.accounts
+        a = accounts.get(first)
+        b = accounts.get(second)
+        if a is None:
+            raise AccountNotFoundError(first)
+        if b is None:
+            raise AccountNotFoundError(second)
+        return a, b
+    
+    def update_account(self, account: Account, now: Optional[datetime] = None) -> None:
         """Update account in database"""
-        account.last_transaction = datetime.now()
+        account.last_transaction = now or datetime.now()
         self.accounts[account.account_number] = account
     
+    def get_or_none(self, account_number: str) -> Optional[Account]:
+        """Get account by number, or None - one lookup instead of account_exists() plus get_account()"""
+        return self.accounts.get(account_number)
+    
     def account_exists(self, account_number: str) -> bool:
         """Check if account exists"""
         return account_number in self.accounts
@@ -68,65 +105,71 @@ class AccountDatabase:
         """Get all accounts (for debugging)"""
         return self.accounts
     
+    def iter_accounts(self) -> ValuesView[Account]:
+        """Live view of all accounts, for loops that don't need a list"""
+        return self.accounts.values()
+    
     # Money Transfer Methods
     def transfer_money(self, sender_account: str, recipient_account: str, amount: Decimal) -> tuple[Account, Account]:
         """Transfer money between accounts"""
         # Get both accounts
-        sender = self.get_account(sender_account)
-        recipient = self.get_account(recipient_account)
+        sender, recipient = self._get_two(sender_account, recipient_account)
         
         # Check sufficient funds
         if sender.balance < amount:
-            raise ValueError(f"Insufficient funds in account {sender_account}")
+            raise InsufficientFundsError(sender_account, sender.balance, amount)
         
         # Perform transfer
         sender.balance -= amount
         recipient.balance += amount
         
-        # Update both accounts
-        self.update_account(sender)
-        self.update_account(recipient)
+        # Update both accounts with one shared timestamp
+        now = datetime.now()
+        self.update_account(sender, now=now)
+        self.update_account(recipient, now=now)
         
         return sender, recipient
     
     # Time Deposit Methods
     def get_interest_rate(self, duration_months: int) -> Decimal:
         """Get interest rate for given duration"""
-        # Find the closest duration with interest rate
-        available_durations = sorted(self.interest_rates.keys())
-        for duration in available_durations:
-            if duration_months <= duration:
-                return self.interest_rates[duration]
+        # Find the smallest tier covering the duration
+        i = bisect.bisect_left(_RATE_KEYS, duration_months)
+        if i < len(_RATE_KEYS):
+            return _RATE_VALUES[i]
         
         # If duration is longer than highest tier, use highest rate
-        return self.interest_rates[max(available_durations)]
+        return _RATE_VALUES[-1]
     
     def create_time_deposit(self, account_number: str, amount: Decimal, duration_months: int, is_test_deposit: bool = False) -> TimeDeposit:
         """Create a new time deposit"""
         # Verify account exists and has sufficient funds
         account = self.get_account(account_number)
         if account.balance < amount:
-            raise ValueError(f"Insufficient funds in account {account_number}")
+            raise InsufficientFundsError(account_number, account.balance, amount)
         
         # Deduct amount from account
+        now = datetime.now()
         account.balance -= amount
-        self.update_account(account)
+        self.update_account(account, now=now)
         
         # Generate unique deposit ID
-        deposit_id = str(uuid.uuid4())[:8]
+        deposit_id = os.urandom(4).hex()
         
         # Calculate interest rate and maturity date
         interest_rate = self.get_interest_rate(duration_months)
-        created_at = datetime.now()
+        created_at = now
         
         # For test deposits, set maturity to 1 second from now
         if is_test_deposit:
-            maturity_date = created_at + timedelta(seconds=1)
+            maturity_date = created_at + _TEST_DELTA
         else:
-            maturity_date = created_at + timedelta(days=duration_months * 30)  # Approximate
+            delta = _MATURITY_DELTAS.get(duration_months) or timedelta(days=duration_months * 30)  # Approximate
+            maturity_date = created_at + delta
         
-        # Create time deposit
-        time_deposit = TimeDeposit(
+        # Create time deposit - every field is generated server-side (amount was
+        # validated by the request model), so construct without re-validating
+        time_deposit = TimeDeposit.model_construct(
             deposit_id=deposit_id,
             account_number=account_number,
             amount=amount,
@@ -139,15 +182,13 @@ class AccountDatabase:
         
         # Store in database
         self.time_deposits[deposit_id] = time_deposit
+        self._deposits_by_account.setdefault(account_number, []).append(deposit_id)
         
         return time_deposit
     
     def get_time_deposits(self, account_number: str) -> List[TimeDeposit]:
         """Get all time deposits for an account"""
-        return [
-            deposit for deposit in self.time_deposits.values()
-            if deposit.account_number == account_number
-        ]
+        return [self.time_deposits[i] for i in self._deposits_by_account.get(account_number, ())]
     
     def get_time_deposit(self, deposit_id: str) -> TimeDeposit:
         """Get specific time deposit by ID"""
@@ -163,24 +204,48 @@ class AccountDatabase:
             raise ValueError(f"Time deposit {deposit_id} is already matured")
         
         # Check if deposit has reached maturity (or force mature for testing)
-        if not force_mature and datetime.now() < deposit.maturity_date:
+        now = datetime.now()
+        if not force_mature and now < deposit.maturity_date:
             raise ValueError(f"Time deposit {deposit_id} has not reached maturity date")
         
-        # Calculate interest earned
-        years = deposit.duration_months / 12
-        interest_earned = deposit.amount * deposit.interest_rate * Decimal(str(years))
-        final_amount = deposit.amount + interest_earned
+        # Calculate interest earned in integer cents (rounded down to the cent)
+        final_cents, = _batch_mature([int(deposit.amount * 100)], [_rate_bps(deposit.interest_rate)], [deposit.duration_months])
+        final_amount = Decimal(final_cents).scaleb(-2)
         
         # Add money back to account with interest
         account = self.get_account(deposit.account_number)
         account.balance += final_amount
-        self.update_account(account)
+        self.update_account(account, now=now)
         
         # Mark deposit as matured
         deposit.is_matured = True
         self.time_deposits[deposit_id] = deposit
         
         return deposit, final_amount
+    
+    def mature_all_due(self, now: Optional[datetime] = None) -> List[tuple[TimeDeposit, Decimal]]:
+        """Mature every deposit past its maturity date in one sweep"""
+        now = now or datetime.now()
+        due = [d for d in self.time_deposits.values() if not d.is_matured and d.maturity_date <= now]
+        if not due:
+            return []
+        
+        # Gather the numeric columns once and run the interest math over all of them together
+        finals = _batch_mature(
+            [int(d.amount * 100) for d in due],
+            [_rate_bps(d.interest_rate) for d in due],
+            [d.duration_months for d in due],
+        )
+        
+        matured = []
+        for deposit, final_cents in zip(due, finals):
+            final_amount = Decimal(final_cents).scaleb(-2)
+            account = self.get_account(deposit.account_number)
+            account.balance += final_amount
+            self.update_account(account, now=now)
+            deposit.is_matured = True
+            matured.append((deposit, final_amount))
+        return matured
 
 # Global database instance
 db = AccountDatabase()
\ No newline at end of file
@@ -2,25 +2,43 @@
 SQLite version of PostgreSQL database for testing without requiring PostgreSQL server
 This uses the same models and structure as PostgreSQL but with SQLite for local testing
 """
-from sqlalchemy import create_engine, Column, String, DECIMAL, DateTime, Boolean, Integer, ForeignKey
+from sqlalchemy import create_engine, Column, String, DECIMAL, DateTime, Boolean, Integer, ForeignKey, Index, text, and_, or_, select, insert, exists, lambda_stmt
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import declarative_base, sessionmaker, Session, relationship
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.sql import func
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+import bisect
 import os
-import uuid
 
-# Database configuration - using SQLite for testing
-DATABASE_URL = "sqlite:///./atm_system.db"
+from exceptions import AccountNotFoundError, InsufficientFundsError
+
+# Database configuration - using SQLite for testing.
+# Test runs (TESTING=1) keep the whole database in memory, so writes never touch disk
+TESTING = os.getenv("TESTING") == "1"
+DATABASE_URL = "sqlite:///:memory:" if TESTING else "sqlite:///./atm_system.db"
 
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL, echo=True)  # echo=True for debugging
+# Statement logging is opt-in (SQL_ECHO=1) so normal requests skip formatting every query.
+# An in-memory database lives and dies with its connection, so tests share one through
+# StaticPool across TestClient's threads instead of each checkout seeing an empty database
+engine = create_engine(
+    DATABASE_URL,
+    echo=os.getenv("SQL_ECHO") == "1",
+    future=True,
+    **({"connect_args": {"check_same_thread": False}, "poolclass": StaticPool} if TESTING else {})
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for all models
 Base = declarative_base()
 
+# Term length in years for every allowed duration (1-60 months), so maturity math never goes through float
+_YEARS_DEC = {m: (Decimal(m) / Decimal(12)).quantize(Decimal("0.000001")) for m in range(1, 61)}
+
 # Database Models (same as PostgreSQL version)
 class AccountModel(Base):
     """SQLAlchemy model for accounts"""
@@ -33,13 +51,16 @@ class AccountModel(Base):
     last_transaction = Column(DateTime, nullable=True)
     status = Column(String(20), default="active")
     
-    # Relationships
-    transactions = relationship("TransactionModel", back_populates="account")
-    time_deposits = relationship("TimeDepositModel", back_populates="account")
+    # Relationships - never lazy-loaded, so a stray attribute access can't turn into N+1
+    # queries; load them explicitly with selectinload() where they're needed
+    transactions = relationship("TransactionModel", back_populates="account", lazy="raise")
+    time_deposits = relationship("TimeDepositModel", back_populates="account", lazy="raise")
 
 class TransactionModel(Base):
     """SQLAlchemy model for transactions"""
     __tablename__ = "transactions"
+    # History queries filter by account and read newest first, so serve them straight from the index
+    __table_args__ = (Index("ix_txn_acct_ts", "account_number", text("timestamp DESC")),)
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     account_number = Column(String(6), ForeignKey("accounts.account_number"), nullable=False)
@@ -73,6 +94,28 @@ class TimeDepositModel(Base):
     # Relationships
     account = relationship("AccountModel", back_populates="time_deposits")
 
+# Interest rates by duration (annual rates as decimals), shared by every session's database object
+INTEREST_RATES = MappingProxyType({
+    1: Decimal('0.01'),   # 1%
+    3: Decimal('0.015'),  # 1.5%
+    6: Decimal('0.02'),   # 2%
+    12: Decimal('0.025'), # 2.5%
+    24: Decimal('0.03'),  # 3%
+    36: Decimal('0.035'), # 3.5%
+    48: Decimal('0.04'),  # 4%
+    60: Decimal('0.045'), # 4.5%
+})
+# Sorted tier lookup table so get_interest_rate can bisect instead of sorting per call
+_RATE_KEYS = tuple(sorted(INTEREST_RATES))
+_RATE_VALUES = tuple(INTEREST_RATES[k] for k in _RATE_KEYS)
+
+# Columns the transaction history endpoint serializes
+_HISTORY_COLUMNS = (
+    TransactionModel.id, TransactionModel.transaction_type, TransactionModel.amount,
+    TransactionModel.balance_before, TransactionModel.balance_after, TransactionModel.timestamp,
+    TransactionModel.description, TransactionModel.reference_id,
+)
+
 # Database dependency for FastAPI
 def get_db():
     """Dependency to get database session"""
@@ -83,35 +126,32 @@ def get_db():
         db.close()
 
 class SQLiteAccountDatabase:
-    """SQLite database implementation for accounts (same interface as PostgreSQL)"""
+    """SQLite database implementation for accounts (same interface as PostgreSQL).
+    
+    One is built per request around that request's session, so it holds nothing else:
+    statement caches live at module level and the rate table is a class attribute.
+    """
+    __slots__ = ("db",)
+    
+    # Interest rates by duration (annual rates as decimals) - shared, read-only
+    interest_rates = INTEREST_RATES
     
     def __init__(self, db_session: Session):
         self.db = db_session
-        
-        # Interest rates by duration (annual rates as decimals)
-        self.interest_rates = {
-            1: Decimal('0.01'),   # 1%
-            3: Decimal('0.015'),  # 1.5%
-            6: Decimal('0.02'),   # 2%
-            12: Decimal('0.025'), # 2.5%
-            24: Decimal('0.03'),  # 3%
-            36: Decimal('0.035'), # 3.5%
-            48: Decimal('0.04'),  # 4%
-            60: Decimal('0.045'), # 4.5%
-        }
     
     def get_account(self, account_number: str) -> Optional[AccountModel]:
         """Get account by number"""
-        account = self.db.query(AccountModel).filter(AccountModel.account_number == account_number).first()
+        account = self.db.execute(
+            lambda_stmt(lambda: select(AccountModel).where(AccountModel.account_number == account_number))
+        ).scalar_one_or_none()
         if not account:
-            raise ValueError(f"Account {account_number} not found")
+            raise AccountNotFoundError(account_number)
         return account
     
     def create_account(self, account_number: str, initial_balance: Decimal = Decimal('0.00')) -> AccountModel:
         """Create a new account"""
         # Check if account already exists
-        existing = self.db.query(AccountModel).filter(AccountModel.account_number == account_number).first()
-        if existing:
+        if self.account_exists(account_number):
             raise ValueError(f"Account {account_number} already exists")
         
         account = AccountModel(
@@ -125,15 +165,26 @@ class SQLiteAccountDatabase:
         self.db.refresh(account)
         return account
     
-    def update_account_balance(self, account_number: str, new_balance: Decimal, transaction_type: str, amount: Decimal, description: str = None) -> AccountModel:
-        """Update account balance and create transaction record"""
-        account = self.get_account(account_number)
+    def update_account_balance(self, account_number: str, new_balance: Decimal, transaction_type: str, amount: Decimal,
+                               description: str = None, account: Optional[AccountModel] = None) -> AccountModel:
+        """Update account balance and create transaction record - pass account if the caller already loaded it"""
+        account = self._apply_balance_change(account_number, new_balance, transaction_type, amount, description, account)
+        self.db.commit()
+        self.db.refresh(account)
+        return account
+    
+    def _apply_balance_change(self, account_number: str, new_balance: Decimal, transaction_type: str, amount: Decimal,
+                              description: str = None, account: Optional[AccountModel] = None) -> AccountModel:
+        """update_account_balance without the commit, for callers folding it into a larger transaction"""
+        if account is None:
+            account = self.get_account(account_number)
         old_balance = account.balance
         
-        # Update account
+        # Update account - one timestamp for the account and its transaction record
+        now = datetime.now()
         account.balance = new_balance
-        account.last_transaction = datetime.now()
-        account.updated_at = datetime.now()
+        account.last_transaction = now
+        account.updated_at = now
         
         # Create transaction record
         transaction = TransactionModel(
@@ -142,22 +193,21 @@ class SQLiteAccountDatabase:
             amount=amount,
             balance_before=old_balance,
             balance_after=new_balance,
-            timestamp=datetime.now(),
+            timestamp=now,
             description=description
         )
         
         self.db.add(transaction)
-        self.db.commit()
-        self.db.refresh(account)
         return account
     
     def account_exists(self, account_number: str) -> bool:
         """Check if account exists"""
-        return self.db.query(AccountModel).filter(AccountModel.account_number == account_number).first() is not None
+        # SELECT EXISTS(...) stops at the index hit and sends back a single boolean
+        return self.db.scalar(lambda_stmt(lambda: select(exists().where(AccountModel.account_number == account_number))))
     
-    def get_all_accounts(self) -> List[AccountModel]:
-        """Get all accounts"""
-        return self.db.query(AccountModel).all()
+    def get_all_accounts(self) -> List[Row]:
+        """Get all accounts as lightweight (account_number, balance, status) rows"""
+        return self.db.query(AccountModel.account_number, AccountModel.balance, AccountModel.status).all()
     
     # Money Transfer Methods
     def transfer_money(self, sender_account: str, recipient_account: str, amount: Decimal, description: str = None) -> tuple[AccountModel, AccountModel]:
@@ -168,24 +218,25 @@ class SQLiteAccountDatabase:
         
         # Check sufficient funds
         if sender.balance < amount:
-            raise ValueError(f"Insufficient funds in account {sender_account}")
+            raise InsufficientFundsError(sender_account, sender.balance, amount)
         
         # Generate reference ID for linking transactions
-        reference_id = str(uuid.uuid4())[:12]
+        reference_id = os.urandom(6).hex()
         
-        # Perform transfer with atomic transaction
+        # Perform transfer with atomic transaction - one timestamp for both sides and both records
+        now = datetime.now()
         try:
             # Update sender
             new_sender_balance = sender.balance - amount
             sender.balance = new_sender_balance
-            sender.last_transaction = datetime.now()
-            sender.updated_at = datetime.now()
+            sender.last_transaction = now
+            sender.updated_at = now
             
             # Update recipient
             new_recipient_balance = recipient.balance + amount
             recipient.balance = new_recipient_balance
-            recipient.last_transaction = datetime.now()
-            recipient.updated_at = datetime.now()
+            recipient.last_transaction = now
+            recipient.updated_at = now
             
             # Create transaction records
             sender_transaction = TransactionModel(
@@ -194,7 +245,7 @@ class SQLiteAccountDatabase:
                 amount=amount,
                 balance_before=sender.balance + amount,  # Original balance
                 balance_after=new_sender_balance,
-                timestamp=datetime.now(),
+                timestamp=now,
                 description=f"Transfer to {recipient_account}: {description}" if description else f"Transfer to {recipient_account}",
                 reference_id=reference_id
             )
@@ -205,7 +256,7 @@ class SQLiteAccountDatabase:
                 amount=amount,
                 balance_before=recipient.balance - amount,  # Original balance
                 balance_after=new_recipient_balance,
-                timestamp=datetime.now(),
+                timestamp=now,
                 description=f"Transfer from {sender_account}: {description}" if description else f"Transfer from {sender_account}",
                 reference_id=reference_id
             )
@@ -225,21 +276,23 @@ class SQLiteAccountDatabase:
     # Time Deposit Methods
     def get_interest_rate(self, duration_months: int) -> Decimal:
         """Get interest rate for given duration"""
-        available_durations = sorted(self.interest_rates.keys())
-        for duration in available_durations:
-            if duration_months <= duration:
-                return self.interest_rates[duration]
-        return self.interest_rates[max(available_durations)]
+        # Find the smallest tier covering the duration
+        i = bisect.bisect_left(_RATE_KEYS, duration_months)
+        if i < len(_RATE_KEYS):
+            return _RATE_VALUES[i]
+        
+        # If duration is longer than highest tier, use highest rate
+        return _RATE_VALUES[-1]
     
     def create_time_deposit(self, account_number: str, amount: Decimal, duration_months: int) -> TimeDepositModel:
         """Create a new time deposit"""
         # Verify account exists and has sufficient funds
         account = self.get_account(account_number)
         if account.balance < amount:
-            raise ValueError(f"Insufficient funds in account {account_number}")
+            raise InsufficientFundsError(account_number, account.balance, amount)
         
         # Generate unique deposit ID
-        deposit_id = str(uuid.uuid4())[:8]
+        deposit_id = os.urandom(4).hex()
         
         # Calculate interest rate and maturity date
         interest_rate = self.get_interest_rate(duration_months)
@@ -247,13 +300,14 @@ class SQLiteAccountDatabase:
         maturity_date = created_at + timedelta(days=duration_months * 30)
         
         try:
-            # Deduct amount from account and create transaction
-            self.update_account_balance(
+            # Deduct amount from account and create transaction - committed together with the deposit row
+            self._apply_balance_change(
                 account_number=account_number,
                 new_balance=account.balance - amount,
                 transaction_type="time_deposit",
                 amount=amount,
-                description=f"Time deposit created: {deposit_id}"
+                description=f"Time deposit created: {deposit_id}",
+                account=account
             )
             
             # Create time deposit
@@ -280,11 +334,15 @@ class SQLiteAccountDatabase:
     
     def get_time_deposits(self, account_number: str) -> List[TimeDepositModel]:
         """Get all time deposits for an account"""
-        return self.db.query(TimeDepositModel).filter(TimeDepositModel.account_number == account_number).all()
+        return list(self.db.execute(
+            lambda_stmt(lambda: select(TimeDepositModel).where(TimeDepositModel.account_number == account_number))
+        ).scalars())
     
     def get_time_deposit(self, deposit_id: str) -> TimeDepositModel:
         """Get specific time deposit by ID"""
-        deposit = self.db.query(TimeDepositModel).filter(TimeDepositModel.deposit_id == deposit_id).first()
+        deposit = self.db.execute(
+            lambda_stmt(lambda: select(TimeDepositModel).where(TimeDepositModel.deposit_id == deposit_id))
+        ).scalar_one_or_none()
         if not deposit:
             raise ValueError(f"Time deposit {deposit_id} not found")
         return deposit
@@ -298,18 +356,19 @@ class SQLiteAccountDatabase:
         
         try:
             # Calculate interest earned
-            years = deposit.duration_months / 12
-            interest_earned = deposit.amount * deposit.interest_rate * Decimal(str(years))
+            years = _YEARS_DEC.get(deposit.duration_months) or Decimal(deposit.duration_months) / Decimal(12)
+            interest_earned = deposit.amount * deposit.interest_rate * years
             final_amount = deposit.amount + interest_earned
             
-            # Add money back to account with interest
+            # Add money back to account with interest - committed together with the deposit update
             account = self.get_account(deposit.account_number)
-            self.update_account_balance(
+            self._apply_balance_change(
                 account_number=deposit.account_number,
                 new_balance=account.balance + final_amount,
                 transaction_type="time_deposit_maturity",
                 amount=final_amount,
-                description=f"Time deposit matured: {deposit_id} (Principal: {deposit.amount}, Interest: {interest_earned})"
+                description=f"Time deposit matured: {deposit_id} (Principal: {deposit.amount}, Interest: {interest_earned})",
+                account=account
             )
             
             # Mark deposit as matured
@@ -326,14 +385,28 @@ class SQLiteAccountDatabase:
             self.db.rollback()
             raise e
     
-    def get_transaction_history(self, account_number: str, limit: int = 50, offset: int = 0) -> List[TransactionModel]:
-        """Get transaction history for an account"""
-        return (self.db.query(TransactionModel)
-                .filter(TransactionModel.account_number == account_number)
-                .order_by(TransactionModel.timestamp.desc())
-                .limit(limit)
-                .offset(offset)
-                .all())
+    def get_transaction_history(self, account_number: str, limit: int = 50, offset: int = 0,
+                                cursor: Optional[Tuple[datetime, int]] = None) -> List[Row]:
+        """Get transaction history for an account, newest first.
+        
+        Pass the (timestamp, id) of the last row already seen as cursor to get the next page;
+        unlike offset, that doesn't make the database walk and discard the earlier rows.
+        Returns plain column rows rather than ORM instances since they only get serialized.
+        The statement is a lambda_stmt, so each shape compiles once and is reused from the cache.
+        """
+        stmt = lambda_stmt(lambda: select(*_HISTORY_COLUMNS)
+                           .where(TransactionModel.account_number == account_number)
+                           .order_by(TransactionModel.timestamp.desc(), TransactionModel.id.desc()))
+        if cursor is not None:
+            last_timestamp, last_id = cursor
+            stmt += lambda s: s.where(or_(
+                TransactionModel.timestamp < last_timestamp,
+                and_(TransactionModel.timestamp == last_timestamp, TransactionModel.id < last_id)
+            ))
+        elif offset:
+            stmt += lambda s: s.offset(offset)
+        stmt += lambda s: s.limit(limit)
+        return self.db.execute(stmt).all()
 
 def create_tables():
     """Create all database tables"""
@@ -343,37 +416,22 @@ def seed_database():
     """Seed database with initial test accounts"""
     db = SessionLocal()
     try:
-        # Check if accounts already exist
-        existing_accounts = db.query(AccountModel).count()
-        if existing_accounts > 0:
+        # Check if accounts already exist - probing one key avoids counting the whole table
+        existing_account = db.scalar(select(AccountModel.account_number).limit(1))
+        if existing_account is not None:
             print("Database already seeded")
             return
         
         # Create sample accounts
+        now = datetime.now()
         accounts = [
-            AccountModel(
-                account_number="123456",
-                balance=Decimal('1000.00'),
-                created_at=datetime.now(),
-                status="active"
-            ),
-            AccountModel(
-                account_number="789012",
-                balance=Decimal('500.00'),
-                created_at=datetime.now(),
-                status="active"
-            ),
-            AccountModel(
-                account_number="555444",
-                balance=Decimal('0.00'),
-                created_at=datetime.now(),
-                status="active"
-            )
+            {"account_number": "123456", "balance": Decimal('1000.00'), "created_at": now, "status": "active"},
+            {"account_number": "789012", "balance": Decimal('500.00'), "created_at": now, "status": "active"},
+            {"account_number": "555444", "balance": Decimal('0.00'), "created_at": now, "status": "active"},
         ]
         
-        for account in accounts:
-            db.add(account)
-        
+        # One multi-row INSERT instead of one per ORM instance
+        db.execute(insert(AccountModel), accounts)
         db.commit()
         print("Database seeded with sample accounts")
         
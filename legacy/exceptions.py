@@ -1,12 +1,7 @@
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 import logging
-import sys
-import os
-
-# Add current directory to Python path for Railway deployment
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from config import settings
@@ -20,6 +15,15 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Settings are fixed for the process lifetime, so resolve the production flag once
+IS_PROD = bool(getattr(settings, "is_production", settings.environment.lower() == "production"))
+
+# Fixed production-mode error details
+_ACCOUNT_NOT_FOUND_DETAIL = "The specified account does not exist"
+_INSUFFICIENT_FUNDS_DETAIL = "Transaction amount exceeds available balance"
+_INVALID_AMOUNT_DETAIL = "The amount provided is invalid"
+_INTERNAL_ERROR_DETAIL = "An unexpected error occurred"
+
 # Custom exceptions (same as before)
 class AccountNotFoundError(Exception):
     """Raised when account is not found"""
@@ -47,13 +51,12 @@ async def account_not_found_handler(request: Request, exc: AccountNotFoundError)
     client_ip = request.client.host
     logger.warning(f"Account not found attempt from {client_ip}: {exc.account_number}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={
             "error": "Account Not Found",
-            "detail": "The specified account does not exist" if settings.is_production 
-                     else str(exc),
-            "account_number": exc.account_number if not settings.is_production else None
+            "detail": _ACCOUNT_NOT_FOUND_DETAIL if IS_PROD else str(exc),
+            "account_number": exc.account_number if not IS_PROD else None
         }
     )
 
@@ -62,14 +65,13 @@ async def insufficient_funds_handler(request: Request, exc: InsufficientFundsErr
     client_ip = request.client.host
     logger.info(f"Insufficient funds attempt from {client_ip}: {exc.account_number}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=400,
         content={
             "error": "Insufficient Funds",
-            "detail": "Transaction amount exceeds available balance" if settings.is_production 
-                     else str(exc),
-            "current_balance": float(exc.balance) if not settings.is_production and exc.balance is not None else None,
-            "requested_amount": float(exc.amount) if not settings.is_production and exc.amount is not None else None
+            "detail": _INSUFFICIENT_FUNDS_DETAIL if IS_PROD else str(exc),
+            "current_balance": float(exc.balance) if not IS_PROD and exc.balance is not None else None,
+            "requested_amount": float(exc.amount) if not IS_PROD and exc.amount is not None else None
         }
     )
 
@@ -78,13 +80,12 @@ async def invalid_amount_handler(request: Request, exc: InvalidAmountError):
     client_ip = request.client.host
     logger.warning(f"Invalid amount attempt from {client_ip}: {exc.amount}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=400,
         content={
             "error": "Invalid Amount",
-            "detail": "The amount provided is invalid" if settings.is_production 
-                     else str(exc),
-            "amount": float(exc.amount) if not settings.is_production and exc.amount is not None else None
+            "detail": _INVALID_AMOUNT_DETAIL if IS_PROD else str(exc),
+            "amount": float(exc.amount) if not IS_PROD and exc.amount is not None else None
         }
     )
 
@@ -95,7 +96,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     
     # Clean up errors to make them JSON serializable
     clean_errors = []
-    if not settings.is_production:
+    if not IS_PROD:
         for error in exc.errors():
             clean_error = {
                 "type": error.get("type"),
@@ -105,7 +106,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             }
             clean_errors.append(clean_error)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Validation Error",
@@ -119,11 +120,10 @@ async def general_exception_handler(request: Request, exc: Exception):
     client_ip = request.client.host
     logger.error(f"Unexpected error from {client_ip}: {exc}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
-            "detail": "An unexpected error occurred" if settings.is_production 
-                     else str(exc)
+            "detail": _INTERNAL_ERROR_DETAIL if IS_PROD else str(exc)
         }
     )
\ No newline at end of file
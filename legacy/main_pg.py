@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -31,10 +32,11 @@ except ImportError:
     settings = FallbackSettings()
 
 from datetime import datetime
+from contextlib import asynccontextmanager
 import logging
 
 # Import PostgreSQL database components
-from database_pg import create_tables, seed_database
+from database_pg import create_tables, seed_database, get_engine, dispose_engine
 
 # Configure logging
 logging.basicConfig(
@@ -42,6 +44,23 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the connection pool and initialize the database on startup, close the pool on shutdown"""
+    get_engine()
+    try:
+        # Create tables if they don't exist
+        await create_tables()
+        
+        # Seed database with initial data
+        await seed_database()
+        
+        logging.info("Database initialized successfully")
+    except Exception as e:
+        logging.error(f"Database initialization failed: {e}")
+    yield
+    await dispose_engine()
+
 # Create FastAPI app with production settings
 app = FastAPI(
     title=settings.app_name,
@@ -49,7 +68,9 @@ app = FastAPI(
     version="1.0.0",
     debug=settings.debug,  # Only True in development
     docs_url="/docs" if not settings.is_production else None,  # Hide docs in production
-    redoc_url="/redoc" if not settings.is_production else None
+    redoc_url="/redoc" if not settings.is_production else None,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Security middleware
@@ -93,20 +114,6 @@ async def health_check():
         "database": "PostgreSQL"
     }
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup"""
-    try:
-        # Create tables if they don't exist
-        create_tables()
-        
-        # Seed database with initial data
-        seed_database()
-        
-        logging.info("Database initialized successfully")
-    except Exception as e:
-        logging.error(f"Database initialization failed: {e}")
-
 if __name__ == "__main__":
     import uvicorn
     import os
@@ -120,5 +127,7 @@ if __name__ == "__main__":
         "main_pg:app", 
         host="0.0.0.0", 
         port=port,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",  # uvloop has no Windows build
+        http="httptools",
         reload=False  # False in production
     )
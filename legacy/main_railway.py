@@ -11,6 +11,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 try:
     from fastapi import FastAPI
+    from fastapi.responses import ORJSONResponse
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.middleware.trustedhost import TrustedHostMiddleware
     from fastapi.exceptions import RequestValidationError
@@ -45,14 +46,15 @@ app = FastAPI(
     title="ATM System API",
     description="A secure ATM system for account management",
     version="1.0.0",
-    debug=False  # Always False for Railway
+    debug=False,  # Always False for Railway
+    default_response_class=ORJSONResponse
 )
 
-# Security middleware
-app.add_middleware(
-    TrustedHostMiddleware, 
-    allowed_hosts=["*"]  # Allow all hosts for Railway
-)
+# Security middleware - Railway allows all hosts by default, and a wildcard allowlist
+# would only add a check that always passes, so register it only when restricted
+allowed_hosts = [host.strip() for host in os.getenv("ALLOWED_HOSTS", "*").split(",")]
+if "*" not in allowed_hosts:
+    app.add_middleware(TrustedHostMiddleware, allowed_hosts=allowed_hosts)
 
 app.add_middleware(
     CORSMiddleware,
@@ -99,5 +101,7 @@ if __name__ == "__main__":
         "main_railway:app", 
         host="0.0.0.0", 
         port=port,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",  # uvloop has no Windows build
+        http="httptools",
         reload=False
     )
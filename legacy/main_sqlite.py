@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -49,7 +50,8 @@ app = FastAPI(
     version="1.0.0",
     debug=settings.debug,  # Only True in development
     docs_url="/docs" if not settings.is_production else None,  # Hide docs in production
-    redoc_url="/redoc" if not settings.is_production else None
+    redoc_url="/redoc" if not settings.is_production else None,
+    default_response_class=ORJSONResponse
 )
 
 # Security middleware
@@ -120,5 +122,7 @@ if __name__ == "__main__":
         "main_sqlite:app", 
         host="0.0.0.0", 
         port=port,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",  # uvloop has no Windows build
+        http="httptools",
         reload=False  # False in production
     )
@@ -1,8 +1,30 @@
-from pydantic import BaseModel, Field, field_validator, model_serializer
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, field_validator, model_serializer
+from typing import Annotated, Optional, Dict, Any
 from datetime import datetime
 from decimal import Decimal
 
+# Decimal amounts go out as JSON numbers; declared per field so pydantic-core does the
+# serialization instead of a Python model_serializer per response
+Money = Annotated[Decimal, PlainSerializer(float, return_type=float)]
+
+# Money is held to cents; hoisted so validators don't rebuild it per call
+_CENT = Decimal('0.01')
+
+def _to_decimal(v) -> Decimal:
+    """Coerce a value to Decimal, going through str() only when it isn't one already"""
+    return v if type(v) is Decimal else Decimal(str(v))
+
+def _quantize_cents(d: Decimal) -> Decimal:
+    """Quantize to 2 places, skipping the work when already there"""
+    return d if d.as_tuple().exponent == -2 else d.quantize(_CENT)
+
+def _check_amount_precision(v) -> Decimal:
+    """Ensure amount has max 2 decimal places"""
+    decimal_v = _to_decimal(v)
+    if decimal_v.as_tuple().exponent < -2:
+        raise ValueError('Amount must have maximum 2 decimal places')
+    return _quantize_cents(decimal_v)
+
 class Account(BaseModel):
     """Account data model with enhanced validation"""
     account_number: str = Field(..., pattern=r"^\d{6}$", description="6-digit account number")
@@ -14,11 +36,7 @@ class Account(BaseModel):
     @classmethod
     def convert_balance_to_decimal(cls, v):
         """Convert balance to Decimal with 2 decimal places"""
-        if isinstance(v, (int, float)):
-            return Decimal(str(v)).quantize(Decimal('0.01'))
-        elif isinstance(v, Decimal):
-            return v.quantize(Decimal('0.01'))
-        return Decimal(str(v)).quantize(Decimal('0.01'))
+        return _quantize_cents(_to_decimal(v))
 
 class TransactionRequest(BaseModel):
     """Base model for transaction requests with strict validation"""
@@ -28,11 +46,7 @@ class TransactionRequest(BaseModel):
     @classmethod
     def validate_amount_precision(cls, v):
         """Ensure amount has max 2 decimal places"""
-        # Convert to Decimal and check precision
-        decimal_v = Decimal(str(v))
-        if decimal_v.as_tuple().exponent < -2:
-            raise ValueError('Amount must have maximum 2 decimal places')
-        return decimal_v.quantize(Decimal('0.01'))
+        return _check_amount_precision(v)
 
 class WithdrawRequest(TransactionRequest):
     """Request model for withdrawal operations"""
@@ -42,42 +56,26 @@ class DepositRequest(TransactionRequest):
     """Request model for deposit operations"""
     pass
 
-# Response models remain the same but add validation
+# Response models remain the same but add validation; the per-request ones are frozen (write-once, hashable)
 class BalanceResponse(BaseModel):
     """Response model for balance queries"""
+    model_config = ConfigDict(frozen=True)
+    
     account_number: str = Field(..., pattern=r"^\d{6}$")
-    balance: Decimal = Field(ge=0)
+    balance: Money = Field(ge=0)
     last_transaction: Optional[datetime] = None
-    
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        return {
-            "account_number": self.account_number,
-            "balance": float(self.balance),
-            "last_transaction": self.last_transaction
-        }
 
 class TransactionResponse(BaseModel):
     """Response model for transaction operations"""
+    model_config = ConfigDict(frozen=True)
+    
     success: bool
     message: str = Field(..., max_length=200)
     account_number: str = Field(..., pattern=r"^\d{6}$")
-    previous_balance: Decimal = Field(ge=0)
-    new_balance: Decimal = Field(ge=0)
-    transaction_amount: Decimal = Field(gt=0)
+    previous_balance: Money = Field(ge=0)
+    new_balance: Money = Field(ge=0)
+    transaction_amount: Money = Field(gt=0)
     timestamp: datetime
-    
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        return {
-            "success": self.success,
-            "message": self.message,
-            "account_number": self.account_number,
-            "previous_balance": float(self.previous_balance),
-            "new_balance": float(self.new_balance),
-            "transaction_amount": float(self.transaction_amount),
-            "timestamp": self.timestamp
-        }
 
 # Money Transfer Models
 class TransferRequest(BaseModel):
@@ -90,45 +88,30 @@ class TransferRequest(BaseModel):
     @classmethod
     def validate_amount_precision(cls, v):
         """Ensure amount has max 2 decimal places"""
-        decimal_v = Decimal(str(v))
-        if decimal_v.as_tuple().exponent < -2:
-            raise ValueError('Amount must have maximum 2 decimal places')
-        return decimal_v.quantize(Decimal('0.01'))
+        return _check_amount_precision(v)
 
 class TransferResponse(BaseModel):
     """Response model for money transfer operations"""
+    model_config = ConfigDict(frozen=True)
+    
     success: bool
     message: str = Field(..., max_length=200)
     sender_account: str = Field(..., pattern=r"^\d{6}$")
     recipient_account: str = Field(..., pattern=r"^\d{6}$")
-    sender_previous_balance: Decimal = Field(ge=0)
-    sender_new_balance: Decimal = Field(ge=0)
-    transfer_amount: Decimal = Field(gt=0)
+    sender_previous_balance: Money = Field(ge=0)
+    sender_new_balance: Money = Field(ge=0)
+    transfer_amount: Money = Field(gt=0)
     transfer_message: Optional[str] = None
     timestamp: datetime
-    
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        return {
-            "success": self.success,
-            "message": self.message,
-            "sender_account": self.sender_account,
-            "recipient_account": self.recipient_account,
-            "sender_previous_balance": float(self.sender_previous_balance),
-            "sender_new_balance": float(self.sender_new_balance),
-            "transfer_amount": float(self.transfer_amount),
-            "transfer_message": self.transfer_message,
-            "timestamp": self.timestamp
-        }
 
 # Time Deposit Models
 class TimeDeposit(BaseModel):
     """Time deposit data model"""
     deposit_id: str = Field(..., description="Unique deposit identifier")
     account_number: str = Field(..., pattern=r"^\d{6}$", description="6-digit account number")
-    amount: Decimal = Field(gt=0, description="Deposit amount")
+    amount: Money = Field(gt=0, description="Deposit amount")
     duration_months: int = Field(ge=1, le=60, description="Deposit duration in months (1-60)")
-    interest_rate: Decimal = Field(ge=0, description="Annual interest rate as decimal")
+    interest_rate: Money = Field(ge=0, description="Annual interest rate as decimal")
     created_at: datetime
     maturity_date: datetime
     is_matured: bool = False
@@ -137,10 +120,7 @@ class TimeDeposit(BaseModel):
     @classmethod
     def validate_amount_precision(cls, v):
         """Ensure amount has max 2 decimal places"""
-        decimal_v = Decimal(str(v))
-        if decimal_v.as_tuple().exponent < -2:
-            raise ValueError('Amount must have maximum 2 decimal places')
-        return decimal_v.quantize(Decimal('0.01'))
+        return _check_amount_precision(v)
 
 class CreateTimeDepositRequest(BaseModel):
     """Request model for creating time deposits"""
@@ -152,10 +132,7 @@ class CreateTimeDepositRequest(BaseModel):
     @classmethod
     def validate_amount_precision(cls, v):
         """Ensure amount has max 2 decimal places"""
-        decimal_v = Decimal(str(v))
-        if decimal_v.as_tuple().exponent < -2:
-            raise ValueError('Amount must have maximum 2 decimal places')
-        return decimal_v.quantize(Decimal('0.01'))
+        return _check_amount_precision(v)
 
 class TimeDepositResponse(BaseModel):
     """Response model for time deposit operations"""
@@ -163,23 +140,12 @@ class TimeDepositResponse(BaseModel):
     message: str = Field(..., max_length=200)
     deposit: Optional[TimeDeposit] = None
     
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        result = {
-            "success": self.success,
-            "message": self.message
-        }
-        if self.deposit:
-            result["deposit"] = {
-                "deposit_id": self.deposit.deposit_id,
-                "account_number": self.deposit.account_number,
-                "amount": float(self.deposit.amount),
-                "duration_months": self.deposit.duration_months,
-                "interest_rate": float(self.deposit.interest_rate),
-                "created_at": self.deposit.created_at,
-                "maturity_date": self.deposit.maturity_date,
-                "is_matured": self.deposit.is_matured
-            }
+    @model_serializer(mode="wrap")
+    def serialize_model(self, handler) -> Dict[str, Any]:
+        # Field serialization runs in pydantic-core; only drop the absent deposit here
+        result = handler(self)
+        if result.get("deposit") is None:
+            result.pop("deposit", None)
         return result
 
 class ListTimeDepositsResponse(BaseModel):
@@ -187,23 +153,3 @@ class ListTimeDepositsResponse(BaseModel):
     success: bool
     message: str = Field(..., max_length=200)
     deposits: list[TimeDeposit] = []
-    
-    @model_serializer
-    def serialize_model(self) -> Dict[str, Any]:
-        return {
-            "success": self.success,
-            "message": self.message,
-            "deposits": [
-                {
-                    "deposit_id": deposit.deposit_id,
-                    "account_number": deposit.account_number,
-                    "amount": float(deposit.amount),
-                    "duration_months": deposit.duration_months,
-                    "interest_rate": float(deposit.interest_rate),
-                    "created_at": deposit.created_at,
-                    "maturity_date": deposit.maturity_date,
-                    "is_matured": deposit.is_matured
-                }
-                for deposit in self.deposits
-            ]
-        }
\ No newline at end of file
@@ -1,220 +1,217 @@
-from fastapi import APIRouter, Path
-import sys
-from pathlib import Path as FilePath
-
-# Add parent directory to Python path for imports
-parent_dir = FilePath(__file__).parent.parent
-sys.path.insert(0, str(parent_dir))
+from fastapi import APIRouter, Path, Request, Response
+from typing import Annotated, Dict
+import hashlib
+import orjson
+import re
+import time
 
+# Sibling modules (models, database, exceptions) resolve through the legacy directory,
+# which the entry point (main*.py) puts on sys.path once at startup
 from models import (
-    BalanceResponse, TransactionResponse, WithdrawRequest, DepositRequest,
+    Account, BalanceResponse, TransactionResponse, WithdrawRequest, DepositRequest,
     TransferRequest, TransferResponse, CreateTimeDepositRequest, 
     TimeDepositResponse, ListTimeDepositsResponse
 )
 from database import db
 from exceptions import AccountNotFoundError, InsufficientFundsError
-from datetime import datetime
+from pydantic import TypeAdapter
 
 # Create router (like Django urls.py)
 router = APIRouter(prefix="/accounts", tags=["ATM Operations"])
 
+# Responses are built from already-validated data, so skip FastAPI's
+# response_model re-validation and dump through cached adapters instead
+_BAL_ADAPTER = TypeAdapter(BalanceResponse)
+_TXN_ADAPTER = TypeAdapter(TransactionResponse)  # Deposit/withdraw hot path: dump_json straight to bytes
+_TRANSFER_ADAPTER = TypeAdapter(TransferResponse)
+_TD_ADAPTER = TypeAdapter(TimeDepositResponse)
+_TD_LIST_ADAPTER = TypeAdapter(ListTimeDepositsResponse)
+_ACCOUNTS_ADAPTER = TypeAdapter(Dict[str, Account])
+
+# Account number path parameter, validated against one shared compiled pattern
+ACCOUNT_NUMBER_RE = re.compile(r"^\d{6}$")
+AccountNumber = Annotated[str, Path(pattern=ACCOUNT_NUMBER_RE.pattern, description="6-digit account number")]
+SenderAccountNumber = Annotated[str, Path(pattern=ACCOUNT_NUMBER_RE.pattern, description="6-digit sender account number")]
+
 # Create a separate router for time deposits that don't need account prefix
 time_deposits_router = APIRouter(prefix="/time-deposits", tags=["Time Deposits"])
 
-@router.get("/{account_number}/balance", response_model=BalanceResponse)
-async def get_balance(account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number")):
+# Serialized balance responses keyed by account number, reused for BALANCE_CACHE_TTL
+# seconds; every route that moves money pops the affected accounts
+BALANCE_CACHE_TTL = 1.0
+balance_cache: dict[str, tuple[float, dict]] = {}
+
+@router.get("/{account_number}/balance", response_model=None, responses={200: {"model": BalanceResponse}})
+async def get_balance(account_number: AccountNumber):
     """Get account balance"""
-    try:
-        account = db.get_account(account_number)
-        return BalanceResponse(
-            account_number=account.account_number,
-            balance=account.balance,
-            last_transaction=account.last_transaction
-        )
-    except ValueError:
+    now = time.monotonic()
+    cached = balance_cache.get(account_number)
+    if cached is not None and now - cached[0] < BALANCE_CACHE_TTL:
+        return cached[1]
+    
+    account = db.get_or_none(account_number)
+    if account is None:
         raise AccountNotFoundError(account_number)
+    payload = _BAL_ADAPTER.dump_python(BalanceResponse.model_construct(
+        account_number=account.account_number,
+        balance=account.balance,
+        last_transaction=account.last_transaction
+    ), mode="json")
+    balance_cache[account_number] = (now, payload)
+    return payload
 
-@router.post("/{account_number}/withdraw", response_model=TransactionResponse)
-async def withdraw_money(request: WithdrawRequest, account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number")):
+@router.post("/{account_number}/withdraw", response_model=None, responses={200: {"model": TransactionResponse}})
+async def withdraw_money(request: WithdrawRequest, account_number: AccountNumber):
     """Withdraw money from account"""
-    try:
-        # Get account
-        account = db.get_account(account_number)
-        
-        # Check sufficient funds
-        if account.balance < request.amount:
-            raise InsufficientFundsError(account_number, account.balance, request.amount)
-        
-        # Perform withdrawal
-        previous_balance = account.balance
-        account.balance -= request.amount
-        
-        # Update database
-        db.update_account(account)
-        
-        return TransactionResponse(
-            success=True,
-            message="Withdrawal successful",
-            account_number=account_number,
-            previous_balance=previous_balance,
-            new_balance=account.balance,
-            transaction_amount=request.amount,
-            timestamp=datetime.now()
-        )
-    
-    except ValueError:
-        raise AccountNotFoundError(account_number)
+    # Get account
+    account = db.get_account(account_number)
+    
+    # Check sufficient funds
+    if account.balance < request.amount:
+        raise InsufficientFundsError(account_number, account.balance, request.amount)
+    
+    # Perform withdrawal
+    previous_balance = account.balance
+    account.balance -= request.amount
+    
+    # Update database - the stored last_transaction doubles as the response timestamp
+    db.update_account(account)
+    balance_cache.pop(account_number, None)
+    
+    return Response(_TXN_ADAPTER.dump_json(TransactionResponse.model_construct(
+        success=True,
+        message="Withdrawal successful",
+        account_number=account_number,
+        previous_balance=previous_balance,
+        new_balance=account.balance,
+        transaction_amount=request.amount,
+        timestamp=account.last_transaction
+    )), media_type="application/json")
 
-@router.post("/{account_number}/deposit", response_model=TransactionResponse)
-async def deposit_money(request: DepositRequest, account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number")):
+@router.post("/{account_number}/deposit", response_model=None, responses={200: {"model": TransactionResponse}})
+async def deposit_money(request: DepositRequest, account_number: AccountNumber):
     """Deposit money to account"""
-    try:
-        # Get account
-        account = db.get_account(account_number)
-        
-        # Perform deposit
-        previous_balance = account.balance
-        account.balance += request.amount
-        
-        # Update database
-        db.update_account(account)
-        
-        return TransactionResponse(
-            success=True,
-            message="Deposit successful", 
-            account_number=account_number,
-            previous_balance=previous_balance,
-            new_balance=account.balance,
-            transaction_amount=request.amount,
-            timestamp=datetime.now()
-        )
-    
-    except ValueError:
-        raise AccountNotFoundError(account_number)
+    # Get account
+    account = db.get_account(account_number)
+    
+    # Perform deposit
+    previous_balance = account.balance
+    account.balance += request.amount
+    
+    # Update database - the stored last_transaction doubles as the response timestamp
+    db.update_account(account)
+    balance_cache.pop(account_number, None)
+    
+    return Response(_TXN_ADAPTER.dump_json(TransactionResponse.model_construct(
+        success=True,
+        message="Deposit successful", 
+        account_number=account_number,
+        previous_balance=previous_balance,
+        new_balance=account.balance,
+        transaction_amount=request.amount,
+        timestamp=account.last_transaction
+    )), media_type="application/json")
 
 # Debug endpoint
-@router.get("/debug/all")
-async def list_all_accounts():
+@router.get("/debug/all", responses={304: {"description": "Accounts unchanged"}})
+async def list_all_accounts(request: Request):
     """Debug endpoint to see all accounts"""
-    return {
-        "total_accounts": len(db.accounts),
-        "accounts": db.get_all_accounts()
-    }
+    accounts = db.get_all_accounts()
+    payload = orjson.dumps({
+        "total_accounts": len(accounts),
+        "accounts": _ACCOUNTS_ADAPTER.dump_python(accounts, mode="json")
+    })
+    
+    # Pollers send back the last ETag; an unchanged snapshot gets an empty 304
+    etag = f'"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(payload, media_type="application/json", headers={"ETag": etag})
 
 # Money Transfer Endpoints
-@router.post("/{account_number}/transfer", response_model=TransferResponse)
+@router.post("/{account_number}/transfer", response_model=None, responses={200: {"model": TransferResponse}})
 async def transfer_money(
     request: TransferRequest, 
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit sender account number")
+    account_number: SenderAccountNumber
 ):
     """Transfer money from sender account to recipient account"""
-    try:
-        # Validate that sender and recipient are different
-        if account_number == request.recipient_account:
-            raise ValueError("Cannot transfer money to the same account")
-        
-        # Perform transfer
-        sender, recipient = db.transfer_money(account_number, request.recipient_account, request.amount)
-        
-        return TransferResponse(
-            success=True,
-            message="Transfer successful",
-            sender_account=account_number,
-            recipient_account=request.recipient_account,
-            sender_previous_balance=sender.balance + request.amount,  # Previous balance before transfer
-            sender_new_balance=sender.balance,
-            transfer_amount=request.amount,
-            transfer_message=request.message,
-            timestamp=datetime.now()
-        )
-    
-    except ValueError as e:
-        if "not found" in str(e):
-            # Either sender or recipient account not found
-            if account_number not in db.accounts:
-                raise AccountNotFoundError(account_number)
-            else:
-                raise AccountNotFoundError(request.recipient_account)
-        elif "Insufficient funds" in str(e):
-            account = db.get_account(account_number)
-            raise InsufficientFundsError(account_number, account.balance, request.amount)
-        else:
-            raise ValueError(str(e))
+    # Validate that sender and recipient are different
+    if account_number == request.recipient_account:
+        raise ValueError("Cannot transfer money to the same account")
+    
+    # Perform transfer - missing accounts and short balances raise their typed errors
+    sender, recipient = db.transfer_money(account_number, request.recipient_account, request.amount)
+    balance_cache.pop(account_number, None)
+    balance_cache.pop(request.recipient_account, None)
+    
+    return _TRANSFER_ADAPTER.dump_python(TransferResponse.model_construct(
+        success=True,
+        message="Transfer successful",
+        sender_account=account_number,
+        recipient_account=request.recipient_account,
+        sender_previous_balance=sender.balance + request.amount,  # Previous balance before transfer
+        sender_new_balance=sender.balance,
+        transfer_amount=request.amount,
+        transfer_message=request.message,
+        timestamp=sender.last_transaction  # Stamped once by transfer_money for both sides
+    ), mode="json")
 
 # Time Deposit Endpoints
-@router.post("/{account_number}/time-deposits", response_model=TimeDepositResponse)
+@router.post("/{account_number}/time-deposits", response_model=None, responses={200: {"model": TimeDepositResponse}})
 async def create_time_deposit(
     request: CreateTimeDepositRequest,
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number")
+    account_number: AccountNumber
 ):
     """Create a new time deposit"""
-    try:
-        # Create time deposit
-        deposit = db.create_time_deposit(
-            account_number, 
-            request.amount, 
-            request.duration_months,
-            request.is_test_deposit
-        )
-        
-        message = f"Time deposit created successfully. Deposit ID: {deposit.deposit_id}"
-        if request.is_test_deposit:
-            message += " (Test deposit - matures in 1 second)"
-        
-        return TimeDepositResponse(
-            success=True,
-            message=message,
-            deposit=deposit
-        )
-    
-    except ValueError as e:
-        if "not found" in str(e):
-            raise AccountNotFoundError(account_number)
-        elif "Insufficient funds" in str(e):
-            account = db.get_account(account_number)
-            raise InsufficientFundsError(account_number, account.balance, request.amount)
-        else:
-            raise ValueError(str(e))
+    # Create time deposit
+    deposit = db.create_time_deposit(
+        account_number, 
+        request.amount, 
+        request.duration_months,
+        request.is_test_deposit
+    )
+    balance_cache.pop(account_number, None)
+    
+    message = f"Time deposit created successfully. Deposit ID: {deposit.deposit_id}"
+    if request.is_test_deposit:
+        message += " (Test deposit - matures in 1 second)"
+    
+    return _TD_ADAPTER.dump_python(TimeDepositResponse.model_construct(
+        success=True,
+        message=message,
+        deposit=deposit
+    ), mode="json")
 
-@router.get("/{account_number}/time-deposits", response_model=ListTimeDepositsResponse)
+@router.get("/{account_number}/time-deposits", response_model=None, responses={200: {"model": ListTimeDepositsResponse}})
 async def list_time_deposits(
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number")
+    account_number: AccountNumber
 ):
     """List all time deposits for an account"""
-    try:
-        # Verify account exists
-        db.get_account(account_number)
-        
-        # Get time deposits
-        deposits = db.get_time_deposits(account_number)
-        
-        return ListTimeDepositsResponse(
-            success=True,
-            message=f"Found {len(deposits)} time deposits",
-            deposits=deposits
-        )
-    
-    except ValueError:
-        raise AccountNotFoundError(account_number)
+    # Verify account exists
+    db.get_account(account_number)
+    
+    # Get time deposits
+    deposits = db.get_time_deposits(account_number)
+    
+    return _TD_LIST_ADAPTER.dump_python(ListTimeDepositsResponse.model_construct(
+        success=True,
+        message=f"Found {len(deposits)} time deposits",
+        deposits=deposits
+    ), mode="json")
 
-@time_deposits_router.post("/{deposit_id}/mature", response_model=TimeDepositResponse)
+@time_deposits_router.post("/{deposit_id}/mature", response_model=None, responses={200: {"model": TimeDepositResponse}})
 async def mature_time_deposit(
     deposit_id: str = Path(..., description="Time deposit ID"),
     force_mature: bool = False
 ):
     """Mature a time deposit and transfer funds back to account with interest"""
-    try:
-        # Mature the deposit
-        deposit, final_amount = db.mature_time_deposit(deposit_id, force_mature)
-        
-        return TimeDepositResponse(
-            success=True,
-            message=f"Time deposit matured successfully. Final amount: ${final_amount:.2f}",
-            deposit=deposit
-        )
-    
-    except ValueError as e:
-        if "not found" in str(e):
-            raise ValueError(f"Time deposit {deposit_id} not found")
-        else:
-            raise ValueError(str(e))
\ No newline at end of file
+    # Mature the deposit
+    deposit, final_amount = db.mature_time_deposit(deposit_id, force_mature)
+    balance_cache.pop(deposit.account_number, None)
+    
+    return _TD_ADAPTER.dump_python(TimeDepositResponse.model_construct(
+        success=True,
+        message=f"Time deposit matured successfully. Final amount: ${final_amount:.2f}",
+        deposit=deposit
+    ), mode="json")
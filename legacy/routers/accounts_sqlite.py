@@ -1,12 +1,11 @@
-from fastapi import APIRouter, Path, Depends, HTTPException
+from fastapi import APIRouter, Path, Depends, HTTPException, Response
+from typing import Annotated, Optional, Tuple
 from sqlalchemy.orm import Session
-import sys
-from pathlib import Path as FilePath
-
-# Add parent directory to Python path for imports
-parent_dir = FilePath(__file__).parent.parent
-sys.path.insert(0, str(parent_dir))
+import base64
+import re
 
+# Sibling modules (models, database, exceptions) resolve through the legacy directory,
+# which the entry point (main*.py) puts on sys.path once at startup
 from models import (
     BalanceResponse, TransactionResponse, WithdrawRequest, DepositRequest,
     TransferRequest, TransferResponse, CreateTimeDepositRequest, 
@@ -15,35 +14,47 @@ from models import (
 from database_sqlite import get_db, SQLiteAccountDatabase, AccountModel, TimeDepositModel
 from exceptions import AccountNotFoundError, InsufficientFundsError, InvalidAmountError
 from datetime import datetime
+from pydantic import TypeAdapter
 from decimal import Decimal
 
 # Create router (like Django urls.py)
 router = APIRouter(prefix="/accounts", tags=["ATM Operations"])
 
+# Responses are built from already-validated data, so skip FastAPI's
+# response_model re-validation and dump through cached adapters instead
+_BAL_ADAPTER = TypeAdapter(BalanceResponse)
+_TXN_ADAPTER = TypeAdapter(TransactionResponse)  # Deposit/withdraw hot path: dump_json straight to bytes
+_TRANSFER_ADAPTER = TypeAdapter(TransferResponse)
+_TD_ADAPTER = TypeAdapter(TimeDepositResponse)
+_TD_LIST_ADAPTER = TypeAdapter(ListTimeDepositsResponse)
+_TD_ROWS_ADAPTER = TypeAdapter(list[TimeDeposit])
+
+# Account number path parameter, validated against one shared compiled pattern
+ACCOUNT_NUMBER_RE = re.compile(r"^\d{6}$")
+AccountNumber = Annotated[str, Path(pattern=ACCOUNT_NUMBER_RE.pattern, description="6-digit account number")]
+SenderAccountNumber = Annotated[str, Path(pattern=ACCOUNT_NUMBER_RE.pattern, description="6-digit sender account number")]
+
 def get_account_db(db: Session = Depends(get_db)) -> SQLiteAccountDatabase:
     """Get account database instance"""
     return SQLiteAccountDatabase(db)
 
-@router.get("/{account_number}/balance", response_model=BalanceResponse)
+@router.get("/{account_number}/balance", response_model=None, responses={200: {"model": BalanceResponse}})
 async def get_balance(
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number"),
+    account_number: AccountNumber,
     account_db: SQLiteAccountDatabase = Depends(get_account_db)
 ):
     """Get account balance"""
-    try:
-        account = account_db.get_account(account_number)
-        return BalanceResponse(
-            account_number=account.account_number,
-            balance=account.balance,
-            last_transaction=account.last_transaction
-        )
-    except ValueError:
-        raise AccountNotFoundError()
+    account = account_db.get_account(account_number)
+    return _BAL_ADAPTER.dump_python(BalanceResponse.model_construct(
+        account_number=account.account_number,
+        balance=account.balance,
+        last_transaction=account.last_transaction
+    ), mode="json")
 
-@router.post("/{account_number}/withdraw", response_model=TransactionResponse)
+@router.post("/{account_number}/withdraw", response_model=None, responses={200: {"model": TransactionResponse}})
 async def withdraw_money(
     request: WithdrawRequest,
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number"),
+    account_number: AccountNumber,
     account_db: SQLiteAccountDatabase = Depends(get_account_db)
 ):
     """Withdraw money from account"""
@@ -52,7 +63,7 @@ async def withdraw_money(
         
         # Check sufficient funds
         if account.balance < request.amount:
-            raise InsufficientFundsError()
+            raise InsufficientFundsError(account_number, account.balance, request.amount)
         
         # Perform withdrawal
         new_balance = account.balance - request.amount
@@ -64,25 +75,25 @@ async def withdraw_money(
             description="ATM withdrawal"
         )
         
-        return TransactionResponse(
+        return Response(_TXN_ADAPTER.dump_json(TransactionResponse.model_construct(
             success=True,
             message="Withdrawal successful",
             account_number=account_number,
             previous_balance=account.balance,
             new_balance=updated_account.balance,
             transaction_amount=request.amount,
-            timestamp=datetime.now()
-        )
+            timestamp=updated_account.last_transaction
+        )), media_type="application/json")
         
-    except ValueError:
-        raise AccountNotFoundError()
+    except (AccountNotFoundError, InsufficientFundsError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transaction failed: {str(e)}")
 
-@router.post("/{account_number}/deposit", response_model=TransactionResponse)
+@router.post("/{account_number}/deposit", response_model=None, responses={200: {"model": TransactionResponse}})
 async def deposit_money(
     request: DepositRequest,
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number"),
+    account_number: AccountNumber,
     account_db: SQLiteAccountDatabase = Depends(get_account_db)
 ):
     """Deposit money to account"""
@@ -99,32 +110,32 @@ async def deposit_money(
             description="ATM deposit"
         )
         
-        return TransactionResponse(
+        return Response(_TXN_ADAPTER.dump_json(TransactionResponse.model_construct(
             success=True,
             message="Deposit successful",
             account_number=account_number,
             previous_balance=account.balance,
             new_balance=updated_account.balance,
             transaction_amount=request.amount,
-            timestamp=datetime.now()
-        )
+            timestamp=updated_account.last_transaction
+        )), media_type="application/json")
         
-    except ValueError:
-        raise AccountNotFoundError()
+    except AccountNotFoundError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transaction failed: {str(e)}")
 
-@router.post("/{sender_account}/transfer", response_model=TransferResponse)
+@router.post("/{sender_account}/transfer", response_model=None, responses={200: {"model": TransferResponse}})
 async def transfer_money(
     request: TransferRequest,
-    sender_account: str = Path(..., pattern=r"^\d{6}$", description="6-digit sender account number"),
+    sender_account: SenderAccountNumber,
     account_db: SQLiteAccountDatabase = Depends(get_account_db)
 ):
     """Transfer money between accounts"""
     try:
         # Validate recipient account exists
         if not account_db.account_exists(request.recipient_account):
-            raise AccountNotFoundError()
+            raise AccountNotFoundError(request.recipient_account)
         
         # Perform transfer
         sender, recipient = account_db.transfer_money(
@@ -134,33 +145,29 @@ async def transfer_money(
             description=request.message
         )
         
-        return TransferResponse(
+        return _TRANSFER_ADAPTER.dump_python(TransferResponse.model_construct(
             success=True,
             message="Transfer successful",
             sender_account=sender_account,
             recipient_account=request.recipient_account,
-            transfer_amount=request.amount,
-            sender_previous_balance=sender.balance + request.amount,  # Calculate previous balance
+            sender_previous_balance=sender.balance + request.amount,  # Previous balance before transfer
             sender_new_balance=sender.balance,
-            recipient_previous_balance=recipient.balance - request.amount,  # Calculate previous balance
-            recipient_new_balance=recipient.balance,
-            timestamp=datetime.now()
-        )
+            transfer_amount=request.amount,
+            transfer_message=request.message,
+            timestamp=sender.last_transaction  # Stamped once by transfer_money for both sides
+        ), mode="json")
         
+    except (AccountNotFoundError, InsufficientFundsError):
+        raise
     except ValueError as e:
-        if "not found" in str(e):
-            raise AccountNotFoundError()
-        elif "Insufficient funds" in str(e):
-            raise InsufficientFundsError()
-        else:
-            raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transfer failed: {str(e)}")
 
-@router.post("/{account_number}/time-deposits", response_model=TimeDepositResponse)
+@router.post("/{account_number}/time-deposits", response_model=None, responses={200: {"model": TimeDepositResponse}})
 async def create_time_deposit(
     request: CreateTimeDepositRequest,
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number"),
+    account_number: AccountNumber,
     account_db: SQLiteAccountDatabase = Depends(get_account_db)
 ):
     """Create a time deposit"""
@@ -172,35 +179,22 @@ async def create_time_deposit(
             duration_months=request.duration_months
         )
         
-        # Get updated account balance
-        account = account_db.get_account(account_number)
-        
-        return TimeDepositResponse(
+        return _TD_ADAPTER.dump_python(TimeDepositResponse.model_construct(
             success=True,
             message=f"Time deposit created successfully. Deposit ID: {time_deposit.deposit_id}",
-            deposit_id=time_deposit.deposit_id,
-            account_number=account_number,
-            amount=time_deposit.amount,
-            duration_months=time_deposit.duration_months,
-            interest_rate=float(time_deposit.interest_rate),
-            maturity_date=time_deposit.maturity_date,
-            account_new_balance=account.balance,
-            timestamp=time_deposit.created_at
-        )
+            deposit=TimeDeposit.model_validate(time_deposit, from_attributes=True)
+        ), mode="json")
         
+    except (AccountNotFoundError, InsufficientFundsError):
+        raise
     except ValueError as e:
-        if "not found" in str(e):
-            raise AccountNotFoundError()
-        elif "Insufficient funds" in str(e):
-            raise InsufficientFundsError()
-        else:
-            raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Time deposit creation failed: {str(e)}")
 
-@router.get("/{account_number}/time-deposits", response_model=ListTimeDepositsResponse)
+@router.get("/{account_number}/time-deposits", response_model=None, responses={200: {"model": ListTimeDepositsResponse}})
 async def get_time_deposits(
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number"),
+    account_number: AccountNumber,
     account_db: SQLiteAccountDatabase = Depends(get_account_db)
 ):
     """Get all time deposits for an account"""
@@ -211,34 +205,21 @@ async def get_time_deposits(
         # Get time deposits
         deposits = account_db.get_time_deposits(account_number)
         
-        # Convert to response models
-        time_deposits = []
-        for deposit in deposits:
-            time_deposits.append(TimeDeposit(
-                deposit_id=deposit.deposit_id,
-                account_number=deposit.account_number,
-                amount=deposit.amount,
-                duration_months=deposit.duration_months,
-                interest_rate=deposit.interest_rate,
-                created_at=deposit.created_at,
-                maturity_date=deposit.maturity_date,
-                is_matured=deposit.is_matured,
-                matured_at=deposit.matured_at,
-                final_amount=deposit.final_amount
-            ))
+        # Convert to response models - the whole list is validated straight off the ORM rows in one pass
+        time_deposits = _TD_ROWS_ADAPTER.validate_python(deposits, from_attributes=True)
         
-        return ListTimeDepositsResponse(
-            account_number=account_number,
-            time_deposits=time_deposits,
-            total_deposits=len(time_deposits)
-        )
+        return _TD_LIST_ADAPTER.dump_python(ListTimeDepositsResponse.model_construct(
+            success=True,
+            message=f"Found {len(time_deposits)} time deposits",
+            deposits=time_deposits
+        ), mode="json")
         
-    except ValueError:
-        raise AccountNotFoundError()
+    except AccountNotFoundError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get time deposits: {str(e)}")
 
-@router.post("/time-deposits/{deposit_id}/mature", response_model=TimeDepositResponse)
+@router.post("/time-deposits/{deposit_id}/mature", response_model=None, responses={200: {"model": TimeDepositResponse}})
 async def mature_time_deposit(
     deposit_id: str = Path(..., description="Time deposit ID"),
     account_db: SQLiteAccountDatabase = Depends(get_account_db)
@@ -248,35 +229,38 @@ async def mature_time_deposit(
         # Mature the deposit
         deposit, final_amount = account_db.mature_time_deposit(deposit_id)
         
-        # Get updated account balance
-        account = account_db.get_account(deposit.account_number)
-        
-        return TimeDepositResponse(
+        return _TD_ADAPTER.dump_python(TimeDepositResponse.model_construct(
             success=True,
             message=f"Time deposit {deposit_id} matured successfully. Final amount: ${final_amount}",
-            deposit_id=deposit.deposit_id,
-            account_number=deposit.account_number,
-            amount=deposit.amount,
-            duration_months=deposit.duration_months,
-            interest_rate=float(deposit.interest_rate),
-            maturity_date=deposit.maturity_date,
-            account_new_balance=account.balance,
-            timestamp=deposit.matured_at or datetime.now(),
-            final_amount=final_amount
-        )
+            deposit=TimeDeposit.model_validate(deposit, from_attributes=True)
+        ), mode="json")
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Time deposit maturation failed: {str(e)}")
 
+def _encode_cursor(transaction) -> str:
+    """Opaque pagination cursor pointing just past a transaction"""
+    raw = f"{transaction.timestamp.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Parse a cursor from _encode_cursor back into (timestamp, id)"""
+    try:
+        timestamp, _, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(timestamp), int(transaction_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
 # Additional endpoints for database features
 
 @router.get("/{account_number}/transactions")
 async def get_transaction_history(
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number"),
+    account_number: AccountNumber,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     account_db: SQLiteAccountDatabase = Depends(get_account_db)
 ):
     """Get transaction history for an account"""
@@ -284,8 +268,9 @@ async def get_transaction_history(
         # Verify account exists
         account_db.get_account(account_number)
         
-        # Get transaction history
-        transactions = account_db.get_transaction_history(account_number, limit, offset)
+        # Get transaction history - continue after the cursor if one was given
+        after = _decode_cursor(cursor) if cursor else None
+        transactions = account_db.get_transaction_history(account_number, limit, offset, cursor=after)
         
         return {
             "account_number": account_number,
@@ -304,17 +289,19 @@ async def get_transaction_history(
             ],
             "total_count": len(transactions),
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            # Pass back as ?cursor= to fetch the next page; None once there are no more rows
+            "next_cursor": _encode_cursor(transactions[-1]) if len(transactions) == limit else None
         }
         
-    except ValueError:
-        raise AccountNotFoundError()
+    except (HTTPException, AccountNotFoundError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get transaction history: {str(e)}")
 
 @router.post("/{account_number}/create")
 async def create_account(
-    account_number: str = Path(..., pattern=r"^\d{6}$", description="6-digit account number"),
+    account_number: AccountNumber,
     initial_balance: float = 0.0,
     account_db: SQLiteAccountDatabase = Depends(get_account_db)
 ):
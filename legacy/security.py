@@ -1,38 +1,68 @@
+import os
 import time
-from collections import defaultdict
 from fastapi import Request, HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 
+# Client counters are split across this many maps (a power of two, picked by hash)
+_SHARDS = 16
+# Drop the idle clients of one shard, round-robin, once every this many requests
+_SWEEP_EVERY = 64
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Simple rate limiting middleware"""
     
-    def __init__(self, app, calls: int = 100, period: int = 60):
+    def __init__(self, app, calls: int = 100, period: int = 60, exempt_paths: frozenset[str] = frozenset({"/health", "/"})):
         super().__init__(app)
         self.calls = calls
         self.period = period
-        self.requests = defaultdict(list)
+        # Probes and preflights on these paths are passed straight through
+        self.exempt_paths = exempt_paths
+        # Test runs (TESTING=1) aren't limited, so fast or parallel suites don't trip it; read once
+        self.disabled = os.getenv("TESTING") == "1"
+        # Fixed-window counter per client: [window id, requests in that window],
+        # a list so the count is bumped in place
+        self.shards: list[dict[str, list[int]]] = [{} for _ in range(_SHARDS)]
+        self._since_sweep = 0
+        self._next_sweep = 0
+    
+    def _sweep(self, window_id: int) -> None:
+        """Forget the next shard's clients with no request in the current window, so the maps don't grow forever"""
+        counters = self.shards[self._next_sweep]
+        self._next_sweep = (self._next_sweep + 1) & (_SHARDS - 1)
+        idle = [ip for ip, entry in counters.items() if entry[0] != window_id]
+        for ip in idle:
+            del counters[ip]
     
     async def dispatch(self, request: Request, call_next):
-        # Get client IP
-        client_ip = request.client.host
+        if self.disabled or request.method == "OPTIONS" or request.scope["path"] in self.exempt_paths:
+            return await call_next(request)
         
-        # Clean old requests
-        now = time.time()
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip] 
-            if now - req_time < self.period
-        ]
+        # Get client IP - requests without one (some proxies, test transports) share a counter
+        client = request.client
+        client_ip = client.host if client is not None else "unknown"
         
-        # Check rate limit
-        if len(self.requests[client_ip]) >= self.calls:
-            raise HTTPException(
-                status_code=429, 
-                detail="Rate limit exceeded. Try again later."
-            )
+        window_id = int(time.monotonic() // self.period)
+        self._since_sweep += 1
+        if self._since_sweep >= _SWEEP_EVERY:
+            self._since_sweep = 0
+            self._sweep(window_id)
         
-        # Add current request
-        self.requests[client_ip].append(now)
+        # Start a fresh count when the client's last request was in an earlier window
+        counters = self.shards[hash(client_ip) & (_SHARDS - 1)]
+        entry = counters.get(client_ip)
+        if entry is None or entry[0] != window_id:
+            counters[client_ip] = [window_id, 1]
+        else:
+            # Check rate limit
+            if entry[1] >= self.calls:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Rate limit exceeded. Try again later."
+                )
+            
+            # Count current request
+            entry[1] += 1
         
         # Process request
         response = await call_next(request)
-        return response
\ No newline at end of file
+        return response
@@ -46,11 +46,7 @@ class TestAccountOperations:
     
     def test_deposit_money(self, client, test_account):
         """Test depositing money"""
-        # Get initial balance
-        initial_response = client.get(f"/accounts/{test_account}/balance")
-        initial_balance = initial_response.json()["balance"]
-        
-        # Deposit money
+        # Deposit money - the response carries the balance before and after
         deposit_amount = 50.00
         response = client.post(
             f"/accounts/{test_account}/deposit",
@@ -60,26 +56,22 @@ class TestAccountOperations:
         data = response.json()
         assert data["success"] is True
         assert data["transaction_amount"] == deposit_amount
-        assert data["new_balance"] == initial_balance + deposit_amount
+        assert data["new_balance"] == data["previous_balance"] + deposit_amount
     
     def test_withdraw_money(self, client, test_account):
         """Test withdrawing money"""
-        # Get initial balance
-        initial_response = client.get(f"/accounts/{test_account}/balance")
-        initial_balance = initial_response.json()["balance"]
-        
-        # Withdraw money (only if sufficient balance)
+        # Withdraw money - the test account starts well above this amount, and the
+        # response carries the balance before and after
         withdraw_amount = 25.00
-        if initial_balance >= withdraw_amount:
-            response = client.post(
-                f"/accounts/{test_account}/withdraw",
-                json={"amount": withdraw_amount}
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] is True
-            assert data["transaction_amount"] == withdraw_amount
-            assert data["new_balance"] == initial_balance - withdraw_amount
+        response = client.post(
+            f"/accounts/{test_account}/withdraw",
+            json={"amount": withdraw_amount}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["transaction_amount"] == withdraw_amount
+        assert data["new_balance"] == data["previous_balance"] - withdraw_amount
     
     def test_withdraw_insufficient_funds(self, client):
         """Test withdrawing more money than available"""
@@ -91,26 +83,16 @@ class TestAccountOperations:
         data = response.json()
         assert "insufficient funds" in data["detail"].lower()
     
-    def test_invalid_transaction_amounts(self, client, test_account):
+    @pytest.mark.parametrize("amount", [
+        -50.00,    # Negative amount
+        0.00,      # Zero amount
+        50000.00,  # Amount too large
+    ])
+    def test_invalid_transaction_amounts(self, client, test_account, amount):
         """Test invalid transaction amounts"""
-        # Test negative amount
         response = client.post(
             f"/accounts/{test_account}/deposit",
-            json={"amount": -50.00}
-        )
-        assert response.status_code == 422
-        
-        # Test zero amount
-        response = client.post(
-            f"/accounts/{test_account}/deposit",
-            json={"amount": 0.00}
-        )
-        assert response.status_code == 422
-        
-        # Test amount too large
-        response = client.post(
-            f"/accounts/{test_account}/deposit",
-            json={"amount": 50000.00}
+            json={"amount": amount}
         )
         assert response.status_code == 422
 
@@ -173,11 +155,13 @@ class TestTimeDeposits:
         assert create_response.status_code == 200
         deposit_id = create_response.json()["deposit"]["deposit_id"]
         
-        # Wait for test deposit to mature (1 second)
-        time.sleep(1.5)
-        
-        # Mature the deposit
-        mature_response = client.post(f"/time-deposits/{deposit_id}/mature")
+        # Mature the deposit - retry until its 1 second term is up instead of sleeping past it
+        deadline = time.monotonic() + 3
+        while True:
+            mature_response = client.post(f"/time-deposits/{deposit_id}/mature")
+            if mature_response.status_code == 200 or time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
         assert mature_response.status_code == 200
         mature_data = mature_response.json()
         assert mature_data["success"] is True
@@ -242,18 +226,14 @@ class TestMoneyTransfers:
 class TestErrorHandling:
     """Test error handling and edge cases"""
     
-    def test_invalid_account_format(self, client):
+    @pytest.mark.parametrize("account", [
+        "12345",    # Too short
+        "1234567",  # Too long
+        "abcdef",   # Non-numeric
+    ])
+    def test_invalid_account_format(self, client, account):
         """Test invalid account number formats"""
-        # Too short
-        response = client.get("/accounts/12345/balance")
-        assert response.status_code == 422
-        
-        # Too long
-        response = client.get("/accounts/1234567/balance")
-        assert response.status_code == 422
-        
-        # Non-numeric
-        response = client.get("/accounts/abcdef/balance")
+        response = client.get(f"/accounts/{account}/balance")
         assert response.status_code == 422
     
     def test_malformed_json(self, client, test_account):
@@ -1,22 +1,63 @@
 """
 Test configuration and utilities
 """
+import os
 import pytest
 import sys
 from pathlib import Path
 from fastapi.testclient import TestClient
 
-# Add backend directory to path
-backend_dir = Path(__file__).parent.parent / "backend"
+# Add the project root (for `backend.*`) and backend directory (the app's own top-level imports)
+# to path - once here, for every test module
+project_root = Path(__file__).parent.parent
+backend_dir = project_root / "backend"
+sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(backend_dir))
 
-from backend.main import create_app
+# Set before the app is imported so rate limiting stays off for the whole run
+os.environ["TESTING"] = "1"
 
-@pytest.fixture
+# CLI-only environment report, never collected - even when its path is passed explicitly
+collect_ignore = ["integration/verify_compatibility.py"]
+
+# The app is imported inside the fixtures below, so collection doesn't pull in the whole backend
+
+@pytest.fixture(scope="session")
+def app():
+    """The module-level app from backend.main"""
+    from backend.main import app as _app
+    return _app
+
+@pytest.fixture(scope="session")
+def test_app():
+    """The shared app wired to the test database"""
+    from backend.test_config import get_test_app
+    return get_test_app()
+
+@pytest.fixture(scope="session")
+def db():
+    """The store the app actually reads - imported as top-level `database` (backend/ is on sys.path)"""
+    from database.test_db import db as _db
+    return _db
+
+@pytest.fixture(scope="session")
+def app_client(app):
+    """One client on backend.main.app for the whole session, shared by every module that tests it"""
+    with TestClient(app, raise_server_exceptions=False) as test_client:
+        yield test_client
+
+@pytest.fixture(scope="session")
+def test_app_client(test_app):
+    """One client on the test-config app for the whole session"""
+    with TestClient(test_app, raise_server_exceptions=False) as test_client:
+        yield test_client
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app"""
-    app = create_app()
-    return TestClient(app)
+    """Create a test client for the FastAPI app - built once, with startup/shutdown run around the session"""
+    from backend.main import create_app
+    with TestClient(create_app()) as test_client:
+        yield test_client
 
 @pytest.fixture
 def test_account():
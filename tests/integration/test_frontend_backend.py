@@ -5,17 +5,26 @@ Tests all ATM operations that the frontend would use
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "http://localhost:8000"
 FRONTEND_ORIGIN = "http://localhost:5173"
 
+# One keep-alive session for every call, sending the frontend's Origin by default
+SESSION = requests.Session()
+SESSION.headers["Origin"] = FRONTEND_ORIGIN
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+def _balance() -> float:
+    """Current balance of the test account, without the test banner"""
+    return SESSION.get(f"{BASE_URL}/accounts/123456/balance").json()["balance"]
+
 def test_cors_preflight():
     """Test CORS preflight request"""
     print("🔍 Testing CORS preflight...")
-    response = requests.options(
+    response = SESSION.options(
         f"{BASE_URL}/accounts/123456/balance",
         headers={
-            "Origin": FRONTEND_ORIGIN,
             "Access-Control-Request-Method": "GET",
             "Access-Control-Request-Headers": "Content-Type"
         }
@@ -29,10 +38,7 @@ def test_cors_preflight():
 def test_balance_check():
     """Test checking account balance"""
     print("\n💰 Testing balance check...")
-    response = requests.get(
-        f"{BASE_URL}/accounts/123456/balance",
-        headers={"Origin": FRONTEND_ORIGIN}
-    )
+    response = SESSION.get(f"{BASE_URL}/accounts/123456/balance")
     print(f"   Status: {response.status_code}")
     data = response.json()
     print(f"   Balance: ${data['balance']}")
@@ -41,17 +47,14 @@ def test_balance_check():
     print("   ✅ Balance check working!")
     return data['balance']
 
-def test_deposit():
+def test_deposit(initial_balance: float = None):
     """Test depositing money"""
     print("\n📥 Testing deposit...")
-    initial_balance = test_balance_check()
+    if initial_balance is None:
+        initial_balance = _balance()
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/accounts/123456/deposit",
-        headers={
-            "Origin": FRONTEND_ORIGIN,
-            "Content-Type": "application/json"
-        },
         json={"amount": 25.50}
     )
     print(f"   Status: {response.status_code}")
@@ -67,17 +70,14 @@ def test_deposit():
     
     return data['new_balance']
 
-def test_withdrawal():
+def test_withdrawal(initial_balance: float = None):
     """Test withdrawing money"""
     print("\n📤 Testing withdrawal...")
-    initial_balance = test_balance_check()
+    if initial_balance is None:
+        initial_balance = _balance()
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/accounts/123456/withdraw",
-        headers={
-            "Origin": FRONTEND_ORIGIN,
-            "Content-Type": "application/json"
-        },
         json={"amount": 75.25}
     )
     print(f"   Status: {response.status_code}")
@@ -93,17 +93,14 @@ def test_withdrawal():
     
     return data['new_balance']
 
-def test_money_transfer():
+def test_money_transfer(initial_balance: float = None):
     """Test money transfer between accounts"""
     print("\n💸 Testing money transfer...")
-    initial_balance = test_balance_check()
+    if initial_balance is None:
+        initial_balance = _balance()
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/accounts/123456/transfer",
-        headers={
-            "Origin": FRONTEND_ORIGIN,
-            "Content-Type": "application/json"
-        },
         json={
             "amount": 50.00,
             "recipient_account": "789012",
@@ -120,18 +117,15 @@ def test_money_transfer():
     assert data['success'] == True
     assert data['sender_new_balance'] == initial_balance - 50.00
     print("   ✅ Money transfer working!")
+    
+    return data['sender_new_balance']
 
 def test_time_deposit():
     """Test creating time deposit"""
     print("\n⏰ Testing time deposit...")
-    initial_balance = test_balance_check()
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/accounts/123456/time-deposits",
-        headers={
-            "Origin": FRONTEND_ORIGIN,
-            "Content-Type": "application/json"
-        },
         json={
             "amount": 100.00,
             "duration_months": 12
@@ -151,7 +145,7 @@ def test_time_deposit():
 def test_health_check():
     """Test health endpoint"""
     print("\n🏥 Testing health check...")
-    response = requests.get(f"{BASE_URL}/health")
+    response = SESSION.get(f"{BASE_URL}/health")
     print(f"   Status: {response.status_code}")
     data = response.json()
     print(f"   Environment: {data.get('environment', 'N/A')}")
@@ -167,10 +161,11 @@ def main():
     try:
         test_cors_preflight()
         test_health_check()
-        test_balance_check()
-        test_deposit()
-        test_withdrawal()
-        test_money_transfer()
+        # Each operation reports the new balance, so it is fetched only once up front
+        balance = test_balance_check()
+        balance = test_deposit(balance)
+        balance = test_withdrawal(balance)
+        test_money_transfer(balance)
         test_time_deposit()
         
         print("\n" + "=" * 50)
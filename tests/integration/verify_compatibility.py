@@ -4,9 +4,10 @@ Environment Compatibility Verification Script
 Ensures Docker environment matches local development environment
 """
 
+import re
 import sys
 import platform
-from importlib.metadata import version
+from importlib.metadata import distributions
 
 def get_python_info():
     """Get Python version and platform info"""
@@ -17,6 +18,10 @@ def get_python_info():
         "architecture": platform.machine(),
     }
 
+def _normalize(name):
+    """Canonical distribution name (PEP 503), so pytest_asyncio and pytest-asyncio match"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
 def get_package_versions():
     """Get versions of key packages"""
     packages = [
@@ -28,14 +33,12 @@ def get_package_versions():
         "pytest-asyncio"
     ]
     
-    versions = {}
-    for package in packages:
-        try:
-            versions[package] = version(package)
-        except Exception as e:
-            versions[package] = f"ERROR: {e}"
-    
-    return versions
+    # Scan the installed distributions once instead of once per package
+    installed = {
+        _normalize(dist.metadata["Name"]): dist.version
+        for dist in distributions() if dist.metadata["Name"]  # Broken installs can lack a name
+    }
+    return {package: installed.get(_normalize(package), "ERROR: not installed") for package in packages}
 
 def verify_compatibility():
     """Verify environment compatibility"""
@@ -1,185 +1,171 @@
-from fastapi.testclient import TestClient
-from backend.test_config import test_app
-from backend.database.test_db import db
+import pytest
+
+@pytest.fixture
+def client(test_app_client):
+    """The session's shared client on the test-config app"""
+    return test_app_client
+
+@pytest.fixture(autouse=True)
+def reset_database(client, db):
+    """Every test starts from the seeded balances - reset on the shared store directly, no request needed"""
+    db.reset_test_data()
 
 class TestAccountBalance:
     """Test balance-related operations"""
     
-    def test_get_balance_existing_account(self):
+    def test_get_balance_existing_account(self, client):
         """Test getting balance for existing account"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            response = client.get("/accounts/123456/balance")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["account_number"] == "123456"
-            assert data["balance"] == 1000.0
-            assert "last_transaction" in data
+        response = client.get("/accounts/123456/balance")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["account_number"] == "123456"
+        assert data["balance"] == 1000.0
+        assert "last_transaction" in data
     
-    def test_get_balance_nonexistent_account(self):
+    def test_get_balance_nonexistent_account(self, client):
         """Test getting balance for non-existent account"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            response = client.get("/accounts/999999/balance")
-            assert response.status_code == 404
-            data = response.json()
-            assert data["error"] == "Account Not Found"
-            assert "999999" in data["detail"]
+        response = client.get("/accounts/999999/balance")
+        assert response.status_code == 404
+        data = response.json()
+        assert data["error"] == "Account Not Found"
+        assert "999999" in data["detail"]
+    
+    def test_balance_not_modified_with_matching_etag(self, client):
+        """Test that a matching If-None-Match returns 304 until the balance changes"""
+        first = client.get("/accounts/123456/balance")
+        etag = first.headers["etag"]
+        
+        response = client.get("/accounts/123456/balance", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        
+        client.post("/accounts/123456/deposit", json={"amount": 10.0})
+        response = client.get("/accounts/123456/balance", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
 
 class TestWithdrawal:
     """Test withdrawal operations"""
     
-    def test_successful_withdrawal(self):
+    def test_successful_withdrawal(self, client):
         """Test successful withdrawal"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            withdrawal_data = {"amount": 200.0}
-            response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] == True
-            assert data["account_number"] == "123456"
-            assert data["previous_balance"] == 1000.0
-            assert data["new_balance"] == 800.0
-            assert data["transaction_amount"] == 200.0
-            assert "timestamp" in data
+        withdrawal_data = {"amount": 200.0}
+        response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] == True
+        assert data["account_number"] == "123456"
+        assert data["previous_balance"] == 1000.0
+        assert data["new_balance"] == 800.0
+        assert data["transaction_amount"] == 200.0
+        assert "timestamp" in data
     
-    def test_insufficient_funds_withdrawal(self):
+    def test_insufficient_funds_withdrawal(self, client):
         """Test withdrawal with insufficient funds"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            withdrawal_data = {"amount": 1500.0}  # More than balance
-            response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
-            
-            assert response.status_code == 400
-            data = response.json()
-            assert data["error"] == "Insufficient Funds"
-            assert data["current_balance"] == 1000.0
-            assert data["requested_amount"] == 1500.0
-    
-    def test_negative_amount_withdrawal(self):
-        """Test withdrawal with negative amount"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            withdrawal_data = {"amount": -100.0}
-            response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
-            
-            assert response.status_code == 422  # Validation error
-            data = response.json()
-            assert data["error"] == "Validation Error"
+        withdrawal_data = {"amount": 1500.0}  # More than balance
+        response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
+        
+        assert response.status_code == 400
+        data = response.json()
+        assert data["error"] == "Insufficient Funds"
+        assert data["current_balance"] == 1000.0
+        assert data["requested_amount"] == 1500.0
     
-    def test_zero_amount_withdrawal(self):
-        """Test withdrawal with zero amount"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            withdrawal_data = {"amount": 0.0}
-            response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
-            
-            assert response.status_code == 422  # Validation error
-    
-    def test_withdrawal_nonexistent_account(self):
+    def test_withdrawal_nonexistent_account(self, client):
         """Test withdrawal from non-existent account"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            withdrawal_data = {"amount": 100.0}
-            response = client.post("/accounts/999999/withdraw", json=withdrawal_data)
-            
-            assert response.status_code == 404
-            data = response.json()
-            assert data["error"] == "Account Not Found"
+        withdrawal_data = {"amount": 100.0}
+        response = client.post("/accounts/999999/withdraw", json=withdrawal_data)
+        
+        assert response.status_code == 404
+        data = response.json()
+        assert data["error"] == "Account Not Found"
 
 class TestDeposit:
     """Test deposit operations"""
     
-    def test_successful_deposit(self):
+    def test_successful_deposit(self, client):
         """Test successful deposit"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            deposit_data = {"amount": 300.0}
-            response = client.post("/accounts/123456/deposit", json=deposit_data)
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] == True
-            assert data["account_number"] == "123456"
-            assert data["previous_balance"] == 1000.0
-            assert data["new_balance"] == 1300.0
-            assert data["transaction_amount"] == 300.0
+        deposit_data = {"amount": 300.0}
+        response = client.post("/accounts/123456/deposit", json=deposit_data)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] == True
+        assert data["account_number"] == "123456"
+        assert data["previous_balance"] == 1000.0
+        assert data["new_balance"] == 1300.0
+        assert data["transaction_amount"] == 300.0
     
-    def test_large_deposit(self):
+    def test_large_deposit(self, client):
         """Test large deposit amount"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            deposit_data = {"amount": 10000.0}
-            response = client.post("/accounts/123456/deposit", json=deposit_data)
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["new_balance"] == 11000.0
-    
-    def test_negative_amount_deposit(self):
-        """Test deposit with negative amount"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            deposit_data = {"amount": -100.0}
-            response = client.post("/accounts/123456/deposit", json=deposit_data)
-            
-            assert response.status_code == 422  # Validation error
+        deposit_data = {"amount": 10000.0}
+        response = client.post("/accounts/123456/deposit", json=deposit_data)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["new_balance"] == 11000.0
     
-    def test_deposit_nonexistent_account(self):
+    def test_deposit_nonexistent_account(self, client):
         """Test deposit to non-existent account"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            deposit_data = {"amount": 100.0}
-            response = client.post("/accounts/999999/deposit", json=deposit_data)
-            
-            assert response.status_code == 404
+        deposit_data = {"amount": 100.0}
+        response = client.post("/accounts/999999/deposit", json=deposit_data)
+        
+        assert response.status_code == 404
+
+class TestInvalidAmounts:
+    """Test amounts rejected by request validation"""
+    
+    @pytest.mark.parametrize("endpoint,amount", [
+        ("withdraw", -100.0),
+        ("withdraw", 0.0),
+        ("deposit", -100.0),
+        ("deposit", 0.0),
+    ])
+    def test_invalid_amount_rejected(self, client, endpoint, amount):
+        """Test non-positive withdrawal and deposit amounts"""
+        response = client.post(f"/accounts/123456/{endpoint}", json={"amount": amount})
+        
+        assert response.status_code == 422  # Validation error
+        assert response.json()["error"] == "Validation Error"
 
 class TestTransactionSequence:
     """Test multiple transactions in sequence"""
     
-    def test_deposit_then_withdraw(self):
+    def test_deposit_then_withdraw(self, client):
         """Test deposit followed by withdrawal"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            # First deposit
-            deposit_data = {"amount": 500.0}
-            response = client.post("/accounts/123456/deposit", json=deposit_data)
-            assert response.status_code == 200
-            assert response.json()["new_balance"] == 1500.0
-            
-            # Then withdraw
-            withdrawal_data = {"amount": 200.0}
-            response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
-            assert response.status_code == 200
-            assert response.json()["new_balance"] == 1300.0
+        # First deposit
+        deposit_data = {"amount": 500.0}
+        response = client.post("/accounts/123456/deposit", json=deposit_data)
+        assert response.status_code == 200
+        assert response.json()["new_balance"] == 1500.0
+        
+        # Then withdraw
+        withdrawal_data = {"amount": 200.0}
+        response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
+        assert response.status_code == 200
+        assert response.json()["new_balance"] == 1300.0
     
-    def test_multiple_small_withdrawals(self):
+    def test_multiple_small_withdrawals(self, client):
         """Test multiple small withdrawals"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            for i in range(5):
-                withdrawal_data = {"amount": 100.0}
-                response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
-                assert response.status_code == 200
-                expected_balance = 1000.0 - (100.0 * (i + 1))
-                assert response.json()["new_balance"] == expected_balance
+        for i in range(5):
+            withdrawal_data = {"amount": 100.0}
+            response = client.post("/accounts/123456/withdraw", json=withdrawal_data)
+            assert response.status_code == 200
+            expected_balance = 1000.0 - (100.0 * (i + 1))
+            assert response.json()["new_balance"] == expected_balance
     
-    def test_empty_account_scenario(self):
+    def test_empty_account_scenario(self, client):
         """Test operations on empty account"""
-        with TestClient(test_app, raise_server_exceptions=False) as client:
-            client.post("/accounts/test/reset")  # Reset database
-            # Use empty account
-            response = client.get("/accounts/555444/balance")
-            assert response.json()["balance"] == 0.0
-            
-            # Try to withdraw from empty account
-            withdrawal_data = {"amount": 10.0}
-            response = client.post("/accounts/555444/withdraw", json=withdrawal_data)
-            assert response.status_code == 400  # Insufficient funds
-            
-            # Deposit to empty account
-            deposit_data = {"amount": 250.0}
-            response = client.post("/accounts/555444/deposit", json=deposit_data)
-            assert response.status_code == 200
+        # Use empty account
+        response = client.get("/accounts/555444/balance")
+        assert response.json()["balance"] == 0.0
+        
+        # Try to withdraw from empty account
+        withdrawal_data = {"amount": 10.0}
+        response = client.post("/accounts/555444/withdraw", json=withdrawal_data)
+        assert response.status_code == 400  # Insufficient funds
+        
+        # Deposit to empty account
+        deposit_data = {"amount": 250.0}
+        response = client.post("/accounts/555444/deposit", json=deposit_data)
+        assert response.status_code == 200
@@ -1,208 +1,228 @@
-from fastapi.testclient import TestClient
-from backend.main import app
-import time
+import asyncio
+import httpx
+import orjson
+import pytest
+import re
+from decimal import Decimal
+from pydantic import ValidationError
 
-client = TestClient(app, raise_server_exceptions=False)
+# Rejected inputs, one parametrized case each
+INVALID_ACCOUNTS = ("12345", "1234567", "abc123", "123-456")
+INVALID_AMOUNTS = (
+    100.123,  # Too many decimals
+    -50.0,    # Negative
+    0.0,      # Zero
+    10001.0,  # Too large
+)
+SQL_INJECTION = (
+    "123456'; DROP TABLE accounts; --",     # SQL-like injection pattern
+    "123456 OR 1=1",                       # Logic injection attempt
+)
+XSS_PAYLOADS = ("javascript:alert('xss')", "<img src=x onerror=alert('xss')>")
+SPECIAL_CHAR_AMOUNTS = ("$100", "100€", "100.00$", "1,000.00", "100 USD")
+UNICODE_INPUTS = ("🏧💰", "₹100", "100€", "مبلغ")
+
+# Request bodies serialized once with orjson and sent as raw content
+JSON_HEADERS = {"content-type": "application/json"}
+WITHDRAW_100_BODY = orjson.dumps({"amount": 100.0})
+LARGE_AMOUNT_BODY = orjson.dumps({"amount": "9" * 1000})  # Very large number as string
+
+# Either rejection is fine for inputs that may or may not survive URL parsing
+REJECT_STATUSES = frozenset({404, 422})
+NOT_FOUND = frozenset({404})
+
+# Account-number payloads that only the full URL path can exercise, each with the statuses it may get
+URL_CASES = (
+    # These get URL-encoded or cause route mismatches (404)
+    ("123456<script>alert('xss')</script>", NOT_FOUND),  # XSS attempt (gets URL encoded)
+    ("<script>alert('xss')</script>", NOT_FOUND),        # XSS attempt (gets URL encoded)
+    ("../../../etc/passwd", NOT_FOUND),                  # Path traversal (route mismatch)
+    # Null bytes and newlines break URL parsing
+    ("123456\x00", REJECT_STATUSES),
+    ("123456\x00admin", REJECT_STATUSES),
+    ("123456\x00.txt", REJECT_STATUSES),
+    ("123456\n\r\t", REJECT_STATUSES),
+)
+
+# Terms a response must never contain, matched anywhere in the body in one case-insensitive scan
+FORBIDDEN_TERMS = re.compile(r"traceback|exception|file|line|python|uvicorn", re.IGNORECASE)
+SENSITIVE_KEYS = re.compile(r"database_url|secret_key|password|token", re.IGNORECASE)
+
+@pytest.fixture
+def client(app_client):
+    """The session's shared client on backend.main.app"""
+    return app_client
+
+@pytest.fixture(scope="module")
+def account_number_adapter():
+    """Validator for the routes' account-number path parameter, for checks that don't need a request"""
+    from pydantic import TypeAdapter
+    from backend.api.accounts import AccountNumber
+    return TypeAdapter(AccountNumber)
 
 class TestSecurityValidation:
     """Test security-related validations"""
     
-    def test_account_number_format_validation(self):
-        """Test account number must be exactly 6 digits"""
-        # Test invalid formats that should trigger validation errors
-        invalid_accounts = ["12345", "1234567", "abc123", "123-456"]
-        
-        for account in invalid_accounts:
-            response = client.get(f"/accounts/{account}/balance")
-            assert response.status_code == 422  # Validation error
-        
-        # Test empty string which should return 404 (route not found)
+    @pytest.mark.parametrize("account", INVALID_ACCOUNTS)
+    def test_account_number_format_validation(self, client, account):
+        """Test account number must be exactly 6 digits - through the full route, so the parameter wiring is covered"""
+        response = client.get(f"/accounts/{account}/balance")
+        assert response.status_code == 422  # Validation error
+    
+    def test_empty_account_number(self, client):
+        """Test empty string which should return 404 (route not found)"""
         response = client.get("/accounts//balance") 
         assert response.status_code == 404
     
-    def test_amount_precision_validation(self):
+    @pytest.mark.parametrize("amount", INVALID_AMOUNTS)
+    def test_amount_precision_validation(self, client, amount):
         """Test amount validation with decimal precision"""
-        # Test invalid amounts
-        invalid_amounts = [
-            {"amount": 100.123},  # Too many decimals
-            {"amount": -50.0},    # Negative
-            {"amount": 0.0},      # Zero
-            {"amount": 10001.0},  # Too large
-        ]
-        
-        for amount_data in invalid_amounts:
-            response = client.post("/accounts/123456/withdraw", json=amount_data)
-            assert response.status_code == 422
+        response = client.post("/accounts/123456/withdraw", json={"amount": amount})
+        assert response.status_code == 422
     
-    def test_malicious_input_validation(self):
+    @pytest.mark.parametrize("malicious_input", SQL_INJECTION)
+    def test_malicious_input_validation(self, account_number_adapter, malicious_input):
         """Test validation against malicious input patterns"""
-        # These inputs should trigger validation errors (422)
-        validation_inputs = [
-            "123456'; DROP TABLE accounts; --",     # SQL-like injection pattern
-            "123456 OR 1=1",                       # Logic injection attempt
-        ]
-        
-        for malicious_input in validation_inputs:
-            response = client.get(f"/accounts/{malicious_input}/balance")
-            # Should fail validation due to regex pattern
-            assert response.status_code == 422
-        
-        # These inputs get URL-encoded or cause route mismatches (404)
-        route_mismatch_inputs = [
-            "123456<script>alert('xss')</script>",  # XSS attempt (gets URL encoded)
-            "../../../etc/passwd",                 # Path traversal (route mismatch)
-        ]
-        
-        for malicious_input in route_mismatch_inputs:
-            response = client.get(f"/accounts/{malicious_input}/balance")
-            # Should not match any route
-            assert response.status_code == 404
-        
-        # Null byte injection and newlines break URL parsing
-        problematic_inputs = ["123456\x00admin", "123456\n\r\t"]
-        for malicious_input in problematic_inputs:
-            try:
-                response = client.get(f"/accounts/{malicious_input}/balance")
-                # If the request somehow succeeds, it should be 404 or 422
-                assert response.status_code in [404, 422]
-            except Exception:
-                # URL parsing fails, which is expected security behavior
-                pass
-    
-    def test_xss_prevention(self):
-        """Test XSS attack prevention"""
-        # These XSS payloads should trigger validation errors
-        validation_xss_payloads = [
-            "javascript:alert('xss')",
-            "<img src=x onerror=alert('xss')>"
-        ]
-        
-        for payload in validation_xss_payloads:
-            # Try to inject in account number
-            response = client.get(f"/accounts/{payload}/balance")
-            assert response.status_code == 422
-        
-        # This payload gets URL-encoded and doesn't match route
-        encoded_payloads = ["<script>alert('xss')</script>"]
-        for payload in encoded_payloads:
+        # Should fail validation due to regex pattern
+        with pytest.raises(ValidationError):
+            account_number_adapter.validate_python(malicious_input)
+    
+    @pytest.mark.parametrize("payload,expected", URL_CASES)
+    def test_url_level_injection(self, client, payload, expected):
+        """Test malicious account numbers that are refused before reaching a handler"""
+        try:
             response = client.get(f"/accounts/{payload}/balance")
-            assert response.status_code == 404
+        except httpx.InvalidURL as e:
+            # URL parsing should fail with null bytes and newlines, which is expected security behavior
+            assert expected is REJECT_STATUSES
+            assert "Invalid non-printable ASCII character" in str(e)
+        else:
+            # If the request somehow succeeds, it must still be rejected
+            assert response.status_code in expected
     
-    def test_large_payload_handling(self):
+    @pytest.mark.parametrize("payload", XSS_PAYLOADS)
+    def test_xss_prevention(self, account_number_adapter, payload):
+        """Test XSS attack prevention"""
+        # Try to inject in account number
+        with pytest.raises(ValidationError):
+            account_number_adapter.validate_python(payload)
+    
+    def test_large_payload_handling(self, client):
         """Test handling of unusually large payloads"""
-        large_amount = "9" * 1000  # Very large number as string
-        
         response = client.post("/accounts/123456/withdraw", 
-                             json={"amount": large_amount})
+                             content=LARGE_AMOUNT_BODY, headers=JSON_HEADERS)
         assert response.status_code == 422
     
-    def test_concurrent_transactions(self):
+    @pytest.mark.asyncio
+    async def test_concurrent_transactions(self, app, db):
         """Test race condition protection"""
-        import threading
-        
         # Reset account balance using test database
-        from backend.database.test_db import db
         db.reset_test_data()
         
-        results = []
-        
-        def make_withdrawal():
-            response = client.post("/accounts/123456/withdraw", 
-                                 json={"amount": 100.0})
-            results.append(response.status_code)
-        
-        # Create multiple threads for concurrent withdrawals
-        threads = []
-        for _ in range(5):
-            thread = threading.Thread(target=make_withdrawal)
-            threads.append(thread)
-        
-        # Start all threads
-        for thread in threads:
-            thread.start()
-        
-        # Wait for completion
-        for thread in threads:
-            thread.join()
-        
-        # Check that not all withdrawals succeeded (some should fail due to insufficient funds)
-        success_count = results.count(200)
-        assert success_count <= 10  # Maximum 10 successful $100 withdrawals from $1000
+        # Fire the withdrawals together on one event loop - the sync routes run in the
+        # app's threadpool, so they really do race in the store
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as async_client:
+            responses = await asyncio.gather(*[
+                async_client.post("/accounts/123456/withdraw", content=WITHDRAW_100_BODY, headers=JSON_HEADERS)
+                for _ in range(5)
+            ])
+        results = [response.status_code for response in responses]
+        
+        # $1000 covers all five $100 withdrawals, so each must succeed, and none may be lost to a race
+        assert results == [200] * 5
+        assert db.get_account("123456").balance == Decimal("500.00")
 
 class TestInputSanitization:
     """Test input sanitization and validation"""
     
-    def test_special_characters_in_amount(self):
+    @pytest.mark.parametrize("amount", SPECIAL_CHAR_AMOUNTS)
+    def test_special_characters_in_amount(self, client, amount):
         """Test special characters in amount field"""
-        special_chars = ["$100", "100€", "100.00$", "1,000.00", "100 USD"]
-        
-        for amount in special_chars:
-            response = client.post("/accounts/123456/withdraw",
-                                 json={"amount": amount})
-            assert response.status_code == 422
+        response = client.post("/accounts/123456/withdraw",
+                             json={"amount": amount})
+        assert response.status_code == 422
     
-    def test_unicode_and_emoji_handling(self):
+    @pytest.mark.parametrize("input_val", UNICODE_INPUTS)
+    def test_unicode_and_emoji_handling(self, account_number_adapter, input_val):
         """Test unicode characters and emojis"""
-        unicode_inputs = ["🏧💰", "₹100", "100€", "مبلغ"]
-        
-        for input_val in unicode_inputs:
-            response = client.get(f"/accounts/{input_val}/balance")
-            assert response.status_code == 422
-    
-    def test_null_byte_injection(self):
-        """Test null byte injection attempts"""
-        null_byte_inputs = ["123456\x00", "123456\x00admin", "123456\x00.txt"]
-        
-        for input_val in null_byte_inputs:
-            try:
-                response = client.get(f"/accounts/{input_val}/balance")
-                # If the request somehow succeeds, it should fail validation
-                assert response.status_code in [404, 422]
-            except Exception as e:
-                # URL parsing should fail with null bytes, which is expected
-                # This is actually good security behavior
-                assert "Invalid non-printable ASCII character" in str(e)
+        with pytest.raises(ValidationError):
+            account_number_adapter.validate_python(input_val)
 
 class TestErrorInformationLeakage:
     """Test that errors don't leak sensitive information"""
     
-    def test_error_responses_no_stack_traces(self):
+    def test_error_responses_no_stack_traces(self, client):
         """Ensure error responses don't contain stack traces"""
         # Test with invalid account
         response = client.get("/accounts/999999/balance")
         assert response.status_code == 404
         
-        error_text = response.text.lower()
-        
         # Should not contain sensitive information
-        forbidden_terms = ["traceback", "exception", "file", "line", "python", "uvicorn"]
-        for term in forbidden_terms:
-            assert term not in error_text
+        match = FORBIDDEN_TERMS.search(response.text)
+        assert match is None, f"Error response leaks {match.group()!r}"
     
-    def test_health_endpoint_info_disclosure(self):
+    def test_health_endpoint_info_disclosure(self, client):
         """Test health endpoint doesn't expose sensitive info"""
         response = client.get("/health")
         assert response.status_code == 200
         
-        data = response.json()
         # Should not expose sensitive system information
-        sensitive_keys = ["database_url", "secret_key", "password", "token"]
-        
-        response_str = str(data).lower()
-        for key in sensitive_keys:
-            assert key not in response_str
+        match = SENSITIVE_KEYS.search(response.text)
+        assert match is None, f"Health response exposes {match.group()!r}"
+
+class TestHostAndPreflight:
+    """Test the host check and CORS preflight middleware"""
+    
+    def test_unknown_host_rejected(self, client):
+        """Requests with a Host outside ALLOWED_HOSTS are refused"""
+        response = client.get("/health", headers={"host": "evil.example.com"})
+        assert response.status_code == 400
+    
+    def test_allowed_host_with_port(self, client):
+        """The port is ignored when matching the Host header"""
+        response = client.get("/health", headers={"host": "localhost:8000"})
+        assert response.status_code == 200
+    
+    def test_preflight_answered(self, client):
+        """A preflight from an allowed origin gets the CORS headers"""
+        response = client.options(
+            "/accounts/123456/balance",
+            headers={
+                "Origin": "http://localhost:5173",
+                "Access-Control-Request-Method": "POST",
+                "Access-Control-Request-Headers": "content-type",
+            }
+        )
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
+        assert response.headers["access-control-allow-headers"] == "content-type"
+    
+    def test_preflight_disallowed_origin(self, client):
+        """A preflight from an unknown origin is refused"""
+        response = client.options(
+            "/accounts/123456/balance",
+            headers={"Origin": "http://evil.example.com", "Access-Control-Request-Method": "GET"}
+        )
+        assert response.status_code == 400
+
+    def test_health_probe_keeps_cors_headers(self, client):
+        """The middleware-served health check still carries CORS headers for the frontend"""
+        response = client.get("/health", headers={"Origin": "http://localhost:5173"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
+        assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
 
 class TestRateLimiting:
     """Test rate limiting functionality"""
     
-    def test_rapid_requests(self):
+    def test_rapid_requests(self, client):
         """Test handling of rapid consecutive requests"""
-        # Make many rapid requests
+        # Make many rapid requests, back to back
         responses = []
         for i in range(20):
             response = client.get("/accounts/123456/balance")
             responses.append(response.status_code)
-            time.sleep(0.1)  # Small delay
         
         # All should succeed in normal conditions
         # In production with rate limiting, some might return 429
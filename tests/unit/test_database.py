@@ -1,18 +1,12 @@
 """
 Unit tests for database operations
 """
+import asyncio
 import pytest
 from decimal import Decimal
 from datetime import datetime
-import sys
-from pathlib import Path
-
-# Add backend directory to path
-project_root = Path(__file__).parent.parent.parent
-backend_dir = project_root / "backend"
-sys.path.insert(0, str(project_root))
-sys.path.insert(0, str(backend_dir))
 
+# Import paths are set up once in tests/conftest.py
 from backend.database.test_db import TestDatabase
 
 class TestAccountDatabase:
@@ -20,10 +14,8 @@ class TestAccountDatabase:
     
     @pytest.fixture
     def db(self):
-        """Create a fresh database instance for each test"""
-        db = TestDatabase()
-        db.reset_test_data()
-        return db
+        """Create a fresh database instance for each test - construction already seeds the accounts"""
+        return TestDatabase()
     
     def test_get_existing_account(self, db):
         """Test getting an existing account"""
@@ -64,6 +56,103 @@ class TestAccountDatabase:
         # Verify reset
         reset_account = db.get_account("123456")
         assert reset_account.balance == Decimal("1000.00")
+    
+    def test_transfer_to_same_account_rejected(self, db):
+        """Test that a self-transfer is refused and leaves the balance alone"""
+        with pytest.raises(ValueError, match="same account"):
+            db.transfer("123456", "123456", Decimal("100.00"))
+        assert db.get_account("123456").balance == Decimal("1000.00")
+        assert db.get_account("123456").last_transaction is None
+
+class TestCentsConversion:
+    """Test the integer-cents money helpers"""
+    
+    def test_round_trip(self):
+        """Test that amounts survive conversion to cents and back"""
+        from backend.database.postgresql import to_cents, from_cents
+        for amount in (Decimal("0.00"), Decimal("0.01"), Decimal("10.50"), Decimal("999999.99")):
+            assert from_cents(to_cents(amount)) == amount
+    
+    def test_to_cents_is_int(self):
+        """Test that cents are plain integers"""
+        from backend.database.postgresql import to_cents
+        assert to_cents(Decimal("123.45")) == 12345
+        assert isinstance(to_cents(Decimal("123.45")), int)
+
+class TestPostgreSQLTransfer:
+    """Test PostgreSQLAccountDatabase.transfer guards that run before any SQL"""
+    
+    def test_same_account_rejected_before_locking(self):
+        """Test that a self-transfer raises without touching the session"""
+        from backend.database.postgresql import PostgreSQLAccountDatabase
+        with pytest.raises(ValueError, match="same account"):
+            asyncio.run(PostgreSQLAccountDatabase(None).transfer("123456", "123456", Decimal("1.00")))
+
+class TestSummaryRefresher:
+    """Test run_summary_refresher"""
+    
+    def test_keeps_refreshing_after_a_failure(self, monkeypatch):
+        """Test that the view is refreshed at once, again each interval, and a failed round doesn't stop it"""
+        from backend.database import postgresql
+        calls = []
+        
+        async def refresh():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("connection refused")
+        monkeypatch.setattr(postgresql, "refresh_account_summary", refresh)
+        
+        async def run():
+            task = asyncio.create_task(postgresql.run_summary_refresher(0))
+            while len(calls) < 3:
+                await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        asyncio.run(asyncio.wait_for(run(), timeout=5))
+        assert len(calls) >= 3
+
+class TestSerializationRetry:
+    """Test retry_on_serialization_failure"""
+    
+    class _PgError(Exception):
+        def __init__(self, pgcode):
+            self.pgcode = pgcode
+    
+    def _flaky(self, pgcode, failures):
+        from sqlalchemy.exc import DBAPIError
+        from backend.database.postgresql import retry_on_serialization_failure
+        calls = []
+        
+        @retry_on_serialization_failure(max_tries=3, backoff=0)
+        async def operation():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise DBAPIError("UPDATE accounts", {}, self._PgError(pgcode))
+            return "done"
+        return operation, calls
+    
+    def test_retries_serialization_failure(self):
+        """Test that a 40001 abort is retried until it succeeds"""
+        operation, calls = self._flaky("40001", failures=2)
+        assert asyncio.run(operation()) == "done"
+        assert len(calls) == 3
+    
+    def test_gives_up_after_max_tries(self):
+        """Test that the last serialization failure is re-raised"""
+        from sqlalchemy.exc import DBAPIError
+        operation, calls = self._flaky("40001", failures=3)
+        with pytest.raises(DBAPIError):
+            asyncio.run(operation())
+        assert len(calls) == 3
+    
+    def test_other_errors_not_retried(self):
+        """Test that non-serialization errors propagate immediately"""
+        from sqlalchemy.exc import DBAPIError
+        operation, calls = self._flaky("23505", failures=1)
+        with pytest.raises(DBAPIError):
+            asyncio.run(operation())
+        assert len(calls) == 1
 
 # Time deposit functionality is not implemented in test database
 # These tests are commented out for now
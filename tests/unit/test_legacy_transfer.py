@@ -0,0 +1,40 @@
+"""Test the legacy PostgreSQL transfer guards"""
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+LEGACY_DIR = Path(__file__).parent.parent.parent / "legacy"
+
+# legacy/ imports its own top-level `models`/`exceptions`, which would clash with the
+# backend modules already in sys.modules, so the router is driven in a child process
+_SELF_TRANSFER = textwrap.dedent("""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from routers import accounts_pg
+    from database_pg import PostgreSQLAccountDatabase
+
+    app = FastAPI()
+    app.include_router(accounts_pg.router)
+    # No session: the self-transfer must be refused before the store touches the database
+    app.dependency_overrides[accounts_pg.get_account_db] = lambda: PostgreSQLAccountDatabase(None)
+    response = TestClient(app).post("/accounts/123456/transfer", json={"recipient_account": "123456", "amount": "10.00"})
+    print(response.status_code, response.json()["detail"])
+""")
+
+def test_self_transfer_is_rejected_not_retried():
+    """Test that a self-transfer is a 400 rather than a 409 after exhausting the optimistic retries"""
+    result = subprocess.run(
+        [sys.executable, "-B", "-c", _SELF_TRANSFER],
+        cwd=LEGACY_DIR, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    status, _, detail = result.stdout.strip().splitlines()[-1].partition(" ")
+    assert status == "400"
+    assert "same account" in detail
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
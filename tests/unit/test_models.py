@@ -4,20 +4,25 @@ Unit tests for account models and validation
 import pytest
 from decimal import Decimal
 from datetime import datetime
-import sys
-from pathlib import Path
-
-# Add backend directory to path
-project_root = Path(__file__).parent.parent.parent
-backend_dir = project_root / "backend"
-sys.path.insert(0, str(project_root))
-sys.path.insert(0, str(backend_dir))
+from pydantic import TypeAdapter, ValidationError
 
+# Import paths are set up once in tests/conftest.py
 from backend.models.schemas import (
     Account, TransactionRequest,
     CreateTimeDepositRequest
 )
 
+# One adapter per model, built once, for validating the raw invalid-case payloads
+ACCOUNT_ADAPTER = TypeAdapter(Account)
+TRANSACTION_ADAPTER = TypeAdapter(TransactionRequest)
+TIME_DEPOSIT_ADAPTER = TypeAdapter(CreateTimeDepositRequest)
+
+# Fixed timestamp for every constructed account, so the tests are deterministic
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+# Amounts used by several tests, parsed once
+D_1000 = Decimal("1000.00")
+D_100_50 = Decimal("100.50")
+
 class TestAccountModel:
     """Test Account model validation"""
     
@@ -25,36 +30,27 @@ class TestAccountModel:
         """Test creating a valid account"""
         account = Account(
             account_number="123456",
-            balance=Decimal("1000.00"),
-            created_at=datetime.now()
+            balance=D_1000,
+            created_at=NOW
         )
         assert account.account_number == "123456"
-        assert account.balance == Decimal("1000.00")
+        assert account.balance == D_1000
         assert account.last_transaction is None
     
-    def test_invalid_account_number(self):
+    @pytest.mark.parametrize("payload", [
+        {"account_number": "12345", "balance": D_1000, "created_at": NOW},  # Too short
+        {"account_number": "1234567", "balance": D_1000, "created_at": NOW},  # Too long
+    ])
+    def test_invalid_account_number(self, payload):
         """Test invalid account number formats"""
-        with pytest.raises(ValueError):
-            Account(
-                account_number="12345",  # Too short
-                balance=Decimal("1000.00"),
-                created_at=datetime.now()
-            )
-        
-        with pytest.raises(ValueError):
-            Account(
-                account_number="1234567",  # Too long
-                balance=Decimal("1000.00"),
-                created_at=datetime.now()
-            )
+        with pytest.raises(ValidationError):
+            ACCOUNT_ADAPTER.validate_python(payload)
     
     def test_negative_balance(self):
         """Test that negative balance is rejected"""
-        with pytest.raises(ValueError):
-            Account(
-                account_number="123456",
-                balance=Decimal("-100.00"),
-                created_at=datetime.now()
+        with pytest.raises(ValidationError):
+            ACCOUNT_ADAPTER.validate_python(
+                {"account_number": "123456", "balance": Decimal("-100.00"), "created_at": NOW}
             )
     
     def test_balance_precision(self):
@@ -62,7 +58,7 @@ class TestAccountModel:
         account = Account(
             account_number="123456",
             balance=1000.50,  # Should be converted to Decimal
-            created_at=datetime.now()
+            created_at=NOW
         )
         assert isinstance(account.balance, Decimal)
         assert account.balance == Decimal("1000.50")
@@ -72,28 +68,19 @@ class TestTransactionRequests:
     
     def test_valid_transaction_request(self):
         """Test valid transaction request"""
-        request = TransactionRequest(amount=Decimal("100.50"))
-        assert request.amount == Decimal("100.50")
+        request = TransactionRequest(amount=D_100_50)
+        assert request.amount == D_100_50
     
-    def test_zero_amount_rejected(self):
-        """Test that zero amount is rejected"""
-        with pytest.raises(ValueError):
-            TransactionRequest(amount=Decimal("0.00"))
-    
-    def test_negative_amount_rejected(self):
-        """Test that negative amount is rejected"""
-        with pytest.raises(ValueError):
-            TransactionRequest(amount=Decimal("-50.00"))
-    
-    def test_amount_too_large(self):
-        """Test that amounts over limit are rejected"""
-        with pytest.raises(ValueError):
-            TransactionRequest(amount=Decimal("20000.00"))
-    
-    def test_amount_precision_validation(self):
-        """Test amount precision validation"""
-        with pytest.raises(ValueError):
-            TransactionRequest(amount=Decimal("100.123"))  # Too many decimal places
+    @pytest.mark.parametrize("amount", [
+        Decimal("0.00"),     # Zero
+        Decimal("-50.00"),   # Negative
+        Decimal("20000.00"), # Over the limit
+        Decimal("100.123"),  # Too many decimal places
+    ])
+    def test_invalid_amount_rejected(self, amount):
+        """Test that zero, negative, too-large and over-precise amounts are rejected"""
+        with pytest.raises(ValidationError):
+            TRANSACTION_ADAPTER.validate_python({"amount": amount})
 
 class TestTimeDepositRequest:
     """Test time deposit request model"""
@@ -101,11 +88,11 @@ class TestTimeDepositRequest:
     def test_valid_time_deposit_request(self):
         """Test valid time deposit request"""
         request = CreateTimeDepositRequest(
-            amount=Decimal("1000.00"),
+            amount=D_1000,
             duration_months=12,
             is_test_deposit=False
         )
-        assert request.amount == Decimal("1000.00")
+        assert request.amount == D_1000
         assert request.duration_months == 12
         assert request.is_test_deposit is False
     
@@ -118,16 +105,11 @@ class TestTimeDepositRequest:
         )
         assert request.is_test_deposit is True
     
-    def test_invalid_duration(self):
+    @pytest.mark.parametrize("duration_months", [
+        0,   # Too short
+        61,  # Too long
+    ])
+    def test_invalid_duration(self, duration_months):
         """Test invalid duration values"""
-        with pytest.raises(ValueError):
-            CreateTimeDepositRequest(
-                amount=Decimal("1000.00"),
-                duration_months=0  # Too short
-            )
-        
-        with pytest.raises(ValueError):
-            CreateTimeDepositRequest(
-                amount=Decimal("1000.00"),
-                duration_months=61  # Too long
-            )
+        with pytest.raises(ValidationError):
+            TIME_DEPOSIT_ADAPTER.validate_python({"amount": D_1000, "duration_months": duration_months})